@@ -0,0 +1,483 @@
+"""Headless batch generation: turn a list of YouTube videos or a playlist into LinkedIn posts.
+
+Every stage's output is saved to a durable job queue as soon as it finishes,
+so rerunning the same command after a failure or crash only repeats the
+stages that did not complete.
+
+Usage:
+    python batch.py --urls talks.txt --output results.jsonl
+    python batch.py --playlist PLxxxxxxxx --output results.parquet --workers 4 --rpm 120
+    python batch.py --urls talks.txt --infographics infographics/
+    python batch.py --urls talks.txt --infographics infographics/ --exports
+    python batch.py --urls talks.txt --transcripts --captions captions/
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from linkedin_generator.job_queue import JOB_QUEUE_PATH, JobQueue
+from linkedin_generator.metrics import render_prometheus
+from linkedin_generator.pipeline import (
+    MAX_CONCURRENT_LLM_CALLS,
+    WORKFLOW_MODE,
+    WORKFLOW_MODES,
+    build_video_content,
+    export_infographic,
+    generate_hashtags,
+    generate_pinned_comment,
+    generate_post,
+    find_reusable_posts,
+    generate_workflow_html,
+    get_youtube_id,
+    html_to_image_simple,
+    remember_posts,
+    suggest_local_hashtags,
+    youtube_cache,
+)
+from linkedin_generator.providers import execute_youtube, get_youtube_client
+from linkedin_generator.rate_limit import TokenBucket
+from linkedin_generator.renderer import RENDER_BACKENDS
+from linkedin_generator.templates import POST_TEMPLATES
+from linkedin_generator.transcripts import get_transcript_brief, with_transcript_brief
+
+# ---- CONFIGURATION ----
+
+# videos().list and playlistItems().list accept at most 50 IDs / results per call
+YOUTUBE_BATCH_SIZE = 50
+
+# At most: five templates, the pinned comment and the hashtags (usually resolved locally),
+# plus the infographic HTML when requested
+LLM_CALLS_PER_VIDEO = 7
+
+DEFAULT_WORKERS = 4
+DEFAULT_REQUESTS_PER_MINUTE = 60
+
+# Parquet results are written in row groups of this many records instead of all at once
+PARQUET_ROW_GROUP_SIZE = 100
+
+# ---- INPUT ----
+
+def read_video_ids(path):
+    """Read YouTube URLs or bare video IDs, one per line; blank lines, # comments and bad URLs are skipped."""
+    video_ids = []
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                video_ids.append(line if '/' not in line else get_youtube_id(line))
+            except ValueError:
+                print(f"⚠️  Skipping line {line_number} of {path}: no video ID in {line!r}", file=sys.stderr)
+    return list(dict.fromkeys(video_ids))
+
+
+def get_playlist_video_ids(youtube, playlist_id):
+    """Page through a playlist, 50 items per request."""
+    video_ids = []
+    page_token = None
+    while True:
+        response = execute_youtube(youtube.playlistItems().list(
+            part='contentDetails',
+            playlistId=playlist_id,
+            maxResults=YOUTUBE_BATCH_SIZE,
+            pageToken=page_token
+        ))
+        video_ids.extend(item['contentDetails']['videoId'] for item in response['items'])
+        page_token = response.get('nextPageToken')
+        if not page_token:
+            return video_ids
+
+
+def fetch_video_contents(youtube, video_ids):
+    """Fetch metadata for all videos with one videos().list call per 50 uncached IDs."""
+
+    def fetch_batch(part, ids):
+        response = execute_youtube(youtube.videos().list(
+            part=part,
+            id=','.join(ids),
+            maxResults=YOUTUBE_BATCH_SIZE
+        ))
+        return response['items']
+
+    items = youtube_cache.get_videos(video_ids, fetch_batch, batch_size=YOUTUBE_BATCH_SIZE)
+    return {video_id: build_video_content(item) for video_id, item in items.items()}
+
+# ---- GENERATION ----
+
+TRANSCRIPT_STAGE = 'transcript'
+PINNED_COMMENT_STAGE = 'pinned_comment'
+HASHTAGS_STAGE = 'hashtags'
+WORKFLOW_HTML_STAGE = 'workflow_html'
+INFOGRAPHIC_STAGE = 'infographic_png'
+# Not saved to the queue; only reported in a record's errors
+EXPORTS_STAGE = 'exports'
+
+
+def post_stage(template):
+    return f"post:{template.key}"
+
+
+def generate_workflow_stage(video_content, workflow_mode=None):
+    """Generate the infographic HTML, raising instead of returning error text."""
+    workflow_html = generate_workflow_html(video_content, mode=workflow_mode)
+    if workflow_html.startswith("Error generating workflow"):
+        raise RuntimeError(workflow_html)
+    return workflow_html
+
+
+def render_infographic_stage(workflow_html, render_backend=None):
+    """Render the infographic PNG, raising when the renderer fails."""
+    image_data = html_to_image_simple(workflow_html, render_backend)
+    if image_data is None:
+        raise RuntimeError("Could not render the infographic")
+    return image_data
+
+
+def find_caption_file(directory, video_id):
+    """Return `<video_id>.vtt` or `<video_id>.srt` in `directory`, or None to use YouTube's captions."""
+    if not directory:
+        return None
+    for extension in ('.vtt', '.srt'):
+        path = os.path.join(directory, video_id + extension)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def transcript_stage(video_id, video_content, captions_dir):
+    """Summarize the video's transcript; an empty brief records that it has no captions."""
+    caption_file = find_caption_file(captions_dir, video_id)
+    return get_transcript_brief(video_id, video_content['title'], caption_file) or ''
+
+
+def llm_stages(video_content, video_url, fresh, infographics, workflow_mode=None):
+    """Map every LLM stage of a video to the call that produces it."""
+    stages = {
+        post_stage(template): lambda template_name=template_name: generate_post(
+            template_name, video_content, video_url, fresh
+        )
+        for template_name, template in POST_TEMPLATES.items()
+    }
+    stages[PINNED_COMMENT_STAGE] = lambda: generate_pinned_comment(video_content, fresh)
+    stages[HASHTAGS_STAGE] = lambda: generate_hashtags(video_content, fresh)
+    if infographics:
+        stages[WORKFLOW_HTML_STAGE] = lambda: generate_workflow_stage(video_content, workflow_mode)
+    return stages
+
+
+def run_stage(job_queue, video_id, stage, func, outputs, errors):
+    """Run one stage and commit its output (or error) to the job queue immediately."""
+    try:
+        output = func()
+    except Exception as e:
+        errors[stage] = str(e)
+        job_queue.save_error(video_id, stage, str(e))
+    else:
+        outputs[stage] = output
+        job_queue.save_output(video_id, stage, output)
+
+
+def reuse_duplicate_posts(job_queue, video_id, video_content, video_url, outputs):
+    """Save a near-duplicate upload's posts as this video's post stages; return the match or None."""
+    reused = find_reusable_posts(video_id, video_content, video_url)
+    if reused is None:
+        return None
+    all_posts, pinned_comment, hashtags, match = reused
+    stages = {post_stage(template): all_posts[template_name] for template_name, template in POST_TEMPLATES.items()}
+    stages[PINNED_COMMENT_STAGE] = pinned_comment
+    stages[HASHTAGS_STAGE] = hashtags
+    for stage, output in stages.items():
+        job_queue.save_output(video_id, stage, output)
+    outputs.update(stages)
+    return match
+
+
+def process_video(job_queue, video_id, video_content, rate_limiter, fresh=False, infographics=False,
+                  transcripts=False, captions_dir=None, reuse=True, workflow_mode=None,
+                  render_backend=None, exports=False):
+    """Run the stages a video is still missing once the global rate limiter allows it.
+
+    Stages saved by an earlier run are reused, so only failed or never-run
+    stages take rate-limiter tokens and make API calls.
+    """
+    video_url = f"https://www.youtube.com/watch?v={video_id}"
+    started = time.monotonic()
+    job_queue.start(video_id)
+    outputs = job_queue.get_outputs(video_id)
+    errors = {}
+
+    # The transcript brief feeds every other stage, so it runs first; its chunk
+    # summaries are paced by the per-provider limiter rather than this bucket
+    if transcripts:
+        if TRANSCRIPT_STAGE not in outputs:
+            run_stage(job_queue, video_id, TRANSCRIPT_STAGE,
+                      lambda: transcript_stage(video_id, video_content, captions_dir), outputs, errors)
+        video_content = with_transcript_brief(video_content, outputs.get(TRANSCRIPT_STAGE))
+
+    # A re-upload of a talk processed earlier gets its posts without any LLM call
+    post_stages = [post_stage(template) for template in POST_TEMPLATES.values()]
+    duplicate = None
+    if reuse and not fresh and not any(stage in outputs for stage in post_stages):
+        duplicate = reuse_duplicate_posts(job_queue, video_id, video_content, video_url, outputs)
+
+    pending = {
+        stage: func
+        for stage, func in llm_stages(video_content, video_url, fresh, infographics, workflow_mode).items()
+        if stage not in outputs
+    }
+    # Hashtags usually come from the local keyword index and need no LLM call; the index
+    # is scored once, and GPT-4o is only asked when it is not confident
+    if HASHTAGS_STAGE in pending:
+        hashtags = suggest_local_hashtags(video_content)
+        if hashtags:
+            del pending[HASHTAGS_STAGE]
+            run_stage(job_queue, video_id, HASHTAGS_STAGE, lambda: hashtags, outputs, errors)
+        else:
+            pending[HASHTAGS_STAGE] = lambda: generate_hashtags(video_content, fresh, local=False)
+
+    if pending:
+        rate_limiter.acquire(len(pending))
+        with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_LLM_CALLS) as executor:
+            futures = [
+                executor.submit(run_stage, job_queue, video_id, stage, func, outputs, errors)
+                for stage, func in pending.items()
+            ]
+            for future in futures:
+                future.result()
+
+    if infographics and INFOGRAPHIC_STAGE not in outputs and WORKFLOW_HTML_STAGE in outputs:
+        run_stage(job_queue, video_id, INFOGRAPHIC_STAGE,
+                  lambda: render_infographic_stage(outputs[WORKFLOW_HTML_STAGE], render_backend), outputs, errors)
+
+    if duplicate is None and all(stage in outputs for stage in post_stages + [PINNED_COMMENT_STAGE, HASHTAGS_STAGE]):
+        remember_posts(video_id, video_content, video_url, {
+            template_name: outputs[post_stage(template)] for template_name, template in POST_TEMPLATES.items()
+        }, outputs[PINNED_COMMENT_STAGE], outputs[HASHTAGS_STAGE])
+
+    record = {
+        'video_id': video_id,
+        'url': video_url,
+        'title': video_content['title'],
+        'channel': video_content['channel'],
+        'published': video_content['published'],
+        'view_count': video_content['view_count'],
+        'posts': {
+            template_name: outputs[post_stage(template)]
+            for template_name, template in POST_TEMPLATES.items()
+            if post_stage(template) in outputs
+        },
+        'pinned_comment': outputs.get(PINNED_COMMENT_STAGE),
+        'hashtags': outputs.get(HASHTAGS_STAGE),
+        'seconds': round(time.monotonic() - started, 2),
+    }
+    if duplicate is not None:
+        record['duplicate_of'] = {'video_id': duplicate['video_id'], 'similarity': round(duplicate['similarity'], 3)}
+    if transcripts:
+        record['transcript_brief'] = outputs.get(TRANSCRIPT_STAGE) or None
+    if infographics:
+        record['infographic'] = save_infographic(infographics, video_id, outputs)
+        if exports and INFOGRAPHIC_STAGE in outputs:
+            # Derived from the saved PNG on every run, so they need no queue stage of their own
+            try:
+                record['exports'] = save_exports(infographics, video_id, export_infographic(outputs[INFOGRAPHIC_STAGE]))
+            except Exception as e:
+                errors[EXPORTS_STAGE] = str(e)
+    job_queue.finish(video_id, json.dumps(errors) if errors else None)
+    if errors:
+        record['errors'] = errors
+    return record
+
+
+def save_infographic(directory, video_id, outputs):
+    """Write the infographic HTML and PNG to `directory`; return the PNG path if there is one."""
+    os.makedirs(directory, exist_ok=True)
+    if WORKFLOW_HTML_STAGE in outputs:
+        with open(os.path.join(directory, f"{video_id}.html"), 'w', encoding='utf-8') as f:
+            f.write(outputs[WORKFLOW_HTML_STAGE])
+    if INFOGRAPHIC_STAGE not in outputs:
+        return None
+    image_path = os.path.join(directory, f"{video_id}.png")
+    with open(image_path, 'wb') as f:
+        f.write(outputs[INFOGRAPHIC_STAGE])
+    return image_path
+
+
+def save_exports(directory, video_id, exports):
+    """Write each size variant as `<video_id>_<name>` to `directory`; return the paths."""
+    paths = []
+    for name, data in exports.items():
+        path = os.path.join(directory, f"{video_id}_{name}")
+        with open(path, 'wb') as f:
+            f.write(data)
+        paths.append(path)
+    return paths
+
+# ---- OUTPUT ----
+
+def result_schema():
+    """Parquet schema of a result record; fields a record does not have are written as nulls."""
+    import pyarrow as pa
+
+    text_map = pa.map_(pa.string(), pa.string())
+    return pa.schema([
+        ('video_id', pa.string()),
+        ('url', pa.string()),
+        ('title', pa.string()),
+        ('channel', pa.string()),
+        ('published', pa.string()),
+        ('view_count', pa.string()),
+        ('posts', text_map),
+        ('pinned_comment', pa.string()),
+        ('hashtags', pa.string()),
+        ('seconds', pa.float64()),
+        ('duplicate_of', pa.struct([('video_id', pa.string()), ('similarity', pa.float64())])),
+        ('transcript_brief', pa.string()),
+        ('infographic', pa.string()),
+        ('exports', pa.list_(pa.string())),
+        ('errors', text_map),
+        ('error', pa.string()),
+    ])
+
+
+class ResultWriter:
+    """Write results as JSONL while they arrive, or as Parquet one row group at a time."""
+
+    def __init__(self, path, row_group_size=PARQUET_ROW_GROUP_SIZE):
+        self.path = path
+        self.parquet = path.endswith('.parquet')
+        self.row_group_size = row_group_size
+        self.records = []
+        if self.parquet:
+            import pyarrow.parquet as pq
+
+            self.schema = result_schema()
+            self._file = pq.ParquetWriter(path, self.schema)
+        else:
+            self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, record):
+        if self.parquet:
+            self.records.append(record)
+            if len(self.records) >= self.row_group_size:
+                self.flush()
+        else:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+
+    def flush(self):
+        """Write the buffered Parquet records as one row group."""
+        if self.records:
+            import pyarrow as pa
+
+            self._file.write_table(pa.Table.from_pylist(self.records, schema=self.schema))
+            self.records = []
+
+    def close(self):
+        if self.parquet:
+            self.flush()
+        self._file.close()
+
+# ---- MAIN ----
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate LinkedIn posts for many YouTube videos.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--urls', help="File with one YouTube URL or video ID per line")
+    source.add_argument('--playlist', help="YouTube playlist ID")
+    parser.add_argument('--output', default='results.jsonl', help="Output path (.jsonl or .parquet)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Videos processed in parallel")
+    parser.add_argument('--rpm', type=float, default=DEFAULT_REQUESTS_PER_MINUTE,
+                        help="Global cap on LLM requests per minute across all workers")
+    parser.add_argument('--infographics', metavar='DIR',
+                        help="Also generate infographics and write the HTML and PNG files to DIR")
+    parser.add_argument('--workflow-mode', choices=WORKFLOW_MODES, default=WORKFLOW_MODE,
+                        help="'html': Claude writes each infographic; 'spec': Claude writes a short spec rendered locally")
+    parser.add_argument('--render-backend', choices=RENDER_BACKENDS,
+                        help="PNG renderer for --infographics; 'svg' draws spec-mode infographics without a browser")
+    parser.add_argument('--exports', action='store_true',
+                        help="Also write portrait, link-card and carousel PDF exports of each infographic (PNG, WebP, JPEG)")
+    parser.add_argument('--transcripts', action='store_true',
+                        help="Summarize each video's transcript once and use it in every post")
+    parser.add_argument('--captions', metavar='DIR',
+                        help="Read transcripts from DIR/<video_id>.vtt or .srt instead of YouTube's captions")
+    parser.add_argument('--no-reuse', action='store_true',
+                        help="Generate posts even for near-duplicate uploads of talks processed before")
+    parser.add_argument('--queue', default=JOB_QUEUE_PATH,
+                        help="Job queue database; rerunning with the same queue resumes unfinished stages")
+    parser.add_argument('--fresh', action='store_true',
+                        help="Discard saved stage outputs and skip cached LLM responses")
+    parser.add_argument('--metrics', metavar='PATH',
+                        help="Write per-stage timing and token metrics (Prometheus text format) to PATH")
+    args = parser.parse_args(argv)
+    if args.exports and not args.infographics:
+        parser.error("--exports requires --infographics DIR")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    youtube = get_youtube_client()
+
+    if args.playlist:
+        video_ids = get_playlist_video_ids(youtube, args.playlist)
+    else:
+        video_ids = read_video_ids(args.urls)
+
+    job_queue = JobQueue(args.queue)
+    if args.fresh:
+        job_queue.reset(video_ids)
+
+    # Metadata is not a queue stage: the YouTube cache already skips the API call for
+    # videos fetched recently, and its TTLs keep view counts from going stale on resume
+    fetched = fetch_video_contents(youtube, video_ids)
+    video_contents = {video_id: fetched[video_id] for video_id in video_ids if video_id in fetched}
+
+    missing = [video_id for video_id in video_ids if video_id not in video_contents]
+    for video_id in missing:
+        print(f"⚠️  Skipping {video_id}: video not found or is private", file=sys.stderr)
+    job_queue.enqueue(video_contents)
+
+    # One bucket shared by every worker; a video takes all of its pending calls' tokens at once
+    calls_per_video = LLM_CALLS_PER_VIDEO + (1 if args.infographics else 0)
+    rate_limiter = TokenBucket(rate=args.rpm / 60, capacity=max(calls_per_video, args.rpm / 60))
+    writer = ResultWriter(args.output)
+    failed = 0
+
+    try:
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            futures = {
+                executor.submit(process_video, job_queue, video_id, video_content, rate_limiter,
+                                args.fresh, args.infographics, args.transcripts or bool(args.captions),
+                                args.captions, not args.no_reuse, args.workflow_mode,
+                                args.render_backend, args.exports): video_id
+                for video_id, video_content in video_contents.items()
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                video_id = futures[future]
+                try:
+                    record = future.result()
+                except Exception as e:
+                    record = {'video_id': video_id, 'error': str(e)}
+                if 'error' in record or 'errors' in record:
+                    failed += 1
+                writer.write(record)
+                print(f"[{done}/{len(futures)}] {video_id}", file=sys.stderr)
+    finally:
+        writer.close()
+        if args.metrics:
+            with open(args.metrics, 'w', encoding='utf-8') as f:
+                f.write(render_prometheus())
+
+    print(f"✅ Wrote {len(video_contents) - failed} results to {args.output} "
+          f"({failed} failed, {len(missing)} not found)", file=sys.stderr)
+    if failed:
+        print("Rerun the same command to retry only the failed stages.", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
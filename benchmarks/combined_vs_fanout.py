@@ -0,0 +1,124 @@
+"""Compare the per-template fan-out with the combined single-call mode.
+
+Runs both generation modes against the live OpenAI API for one video and
+reports wall-clock latency and token usage/cost for each. The response cache
+is bypassed so every round pays for real completions.
+
+Usage:
+    python benchmarks/combined_vs_fanout.py "https://www.youtube.com/watch?v=..." --rounds 3
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from linkedin_generator import pipeline  # noqa: E402
+from linkedin_generator.llm import cached_prompt_tokens  # noqa: E402
+from linkedin_generator.providers import get_openai_client, override_client  # noqa: E402
+
+# ---- CONFIGURATION ----
+
+# USD per million tokens; override to match current pricing
+DEFAULT_INPUT_PRICE = 2.50
+DEFAULT_CACHED_INPUT_PRICE = 1.25
+DEFAULT_OUTPUT_PRICE = 10.00
+
+# ---- USAGE RECORDING ----
+
+class UsageRecorder:
+    """Wrap an OpenAI client and record the `usage` of every chat completion."""
+
+    def __init__(self, client):
+        self._client = client
+        self._lock = threading.Lock()
+        self.usages = []
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        response = self._client.chat.completions.create(**kwargs)
+        with self._lock:
+            self.usages.append(response.usage)
+        return response
+
+    def reset(self):
+        with self._lock:
+            self.usages = []
+
+# ---- BENCHMARK ----
+
+def run_mode(name, generate, recorder, video_content, video_url, rounds, input_price, output_price,
+             cached_input_price=DEFAULT_CACHED_INPUT_PRICE):
+    """Time `rounds` fresh generations and total their token usage."""
+    timings = []
+    prompt_tokens = cached_tokens = completion_tokens = calls = 0
+    for _ in range(rounds):
+        recorder.reset()
+        started = time.perf_counter()
+        generate(video_content, video_url, fresh=True)
+        timings.append(time.perf_counter() - started)
+        calls += len(recorder.usages)
+        prompt_tokens += sum(usage.prompt_tokens for usage in recorder.usages)
+        cached_tokens += sum(cached_prompt_tokens(usage) for usage in recorder.usages)
+        completion_tokens += sum(usage.completion_tokens for usage in recorder.usages)
+
+    cost = ((prompt_tokens - cached_tokens) * input_price + cached_tokens * cached_input_price
+            + completion_tokens * output_price) / 1_000_000
+    return {
+        'mode': name,
+        'rounds': rounds,
+        'mean_seconds': round(statistics.mean(timings), 2),
+        'min_seconds': round(min(timings), 2),
+        'calls_per_round': calls / rounds,
+        'prompt_tokens_per_round': prompt_tokens / rounds,
+        'cached_prompt_ratio': round(cached_tokens / prompt_tokens, 3) if prompt_tokens else 0.0,
+        'completion_tokens_per_round': completion_tokens / rounds,
+        'cost_per_round_usd': round(cost / rounds, 4),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('url', help="YouTube video URL to generate for")
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--input-price', type=float, default=DEFAULT_INPUT_PRICE, help="USD per 1M input tokens")
+    parser.add_argument('--cached-input-price', type=float, default=DEFAULT_CACHED_INPUT_PRICE,
+                        help="USD per 1M input tokens served from the prompt cache")
+    parser.add_argument('--output-price', type=float, default=DEFAULT_OUTPUT_PRICE, help="USD per 1M output tokens")
+    parser.add_argument('--output', help="Write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    try:
+        video_id, video_content = pipeline.get_video_content(args.url)
+    except Exception as e:
+        sys.exit(f"Could not fetch {args.url}: {e}")
+
+    recorder = UsageRecorder(get_openai_client())
+    override_client('openai', recorder)
+
+    results = [
+        run_mode("fan-out", pipeline.generate_all_template_posts, recorder, video_content, args.url,
+                 args.rounds, args.input_price, args.output_price, args.cached_input_price),
+        run_mode("combined", pipeline.generate_all_template_posts_combined, recorder, video_content, args.url,
+                 args.rounds, args.input_price, args.output_price, args.cached_input_price),
+    ]
+
+    print(f"{'mode':<10} {'mean s':>8} {'min s':>8} {'calls':>6} {'in tok':>9} {'cached':>7} {'out tok':>9} {'$/video':>9}")
+    for result in results:
+        print(f"{result['mode']:<10} {result['mean_seconds']:>8} {result['min_seconds']:>8} "
+              f"{result['calls_per_round']:>6.0f} {result['prompt_tokens_per_round']:>9.0f} "
+              f"{result['cached_prompt_ratio']:>7.0%} "
+              f"{result['completion_tokens_per_round']:>9.0f} {result['cost_per_round_usd']:>9}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'video_id': video_id, 'title': video_content['title'], 'results': results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Compare one capture plus derived exports against one render per size.
+
+The recorded compact-mode infographic is rendered once with `--backend`,
+then every size variant, format and the carousel PDF is derived from that
+capture with the export pool (`--workers` processes). The baseline produces
+the same files with one render per size, encoded one after another.
+Reported: wall time of both paths over `--rounds` rounds, and the size of
+every export next to an unoptimized truecolor screenshot of that size.
+
+Usage:
+    python benchmarks/exports.py --rounds 5
+    python benchmarks/exports.py --backend html2image --workers 4 --output exports.json
+"""
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.offline import DEFAULT_RECORDINGS, git_commit, peak_rss_mb, summarize
+from benchmarks.renderers import BACKENDS
+
+# ---- MEASUREMENT ----
+
+def truecolor_png(png_bytes, size):
+    """A screenshot-style PNG of the capture at `size`: RGB, default compression."""
+    from PIL import Image
+
+    from linkedin_generator.exports import fit_to
+
+    output = io.BytesIO()
+    fit_to(Image.open(io.BytesIO(png_bytes)).convert('RGB'), size).save(output, 'PNG')
+    return output.getvalue()
+
+
+def run(args):
+    from benchmarks.fakes import DEFAULT_WORKFLOW_SPEC, load_recordings
+    from linkedin_generator import exports
+    from linkedin_generator.infographic import normalize_spec, render_infographic
+    from linkedin_generator.pipeline import build_video_content
+    from linkedin_generator.renderer import create_renderer
+
+    exports.EXPORT_WORKERS = args.workers
+    recordings = load_recordings(args.recordings)
+    spec = normalize_spec(recordings.get('workflow_spec') or DEFAULT_WORKFLOW_SPEC)
+    html = render_infographic(spec, build_video_content(recordings['video_item']))
+    renderer = create_renderer(args.backend)
+    renderer.render(html)
+
+    # Starts the worker processes, so the timed rounds measure a warm pool like a running app
+    started = time.perf_counter()
+    exports.export_images(renderer.render(html))
+    first_export_seconds = time.perf_counter() - started
+
+    single, separate = [], []
+    for _ in range(args.rounds):
+        started = time.perf_counter()
+        files = exports.export_images(renderer.render(html))
+        single.append(time.perf_counter() - started)
+
+        # The same files, but each size (and the carousel) rendered on its own and encoded in turn
+        started = time.perf_counter()
+        for variant in exports.EXPORT_VARIANTS:
+            exports.export_variant(renderer.render(html), variant, exports.EXPORT_FORMATS)
+        exports.export_carousel(renderer.render(html))
+        separate.append(time.perf_counter() - started)
+
+    capture = renderer.render(html)
+    screenshots = {variant: truecolor_png(capture, size) for variant, size in exports.EXPORT_VARIANTS.items()}
+
+    return {
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'backend': args.backend,
+        'workers': args.workers,
+        'rounds': args.rounds,
+        'first_export_seconds': round(first_export_seconds, 3),
+        'single_capture_seconds': summarize(single),
+        'render_per_size_seconds': summarize(separate),
+        'screenshot_bytes': {variant: len(data) for variant, data in screenshots.items()},
+        'export_bytes': {name: len(data) for name, data in files.items()},
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+# ---- REPORTING ----
+
+def print_results(results):
+    single, separate = results['single_capture_seconds'], results['render_per_size_seconds']
+    print(f"\n{results['backend']} backend, {results['workers']} export workers, {results['rounds']} rounds")
+    print(f"  one capture + all exports  p50 {single.get('p50', '-')}s  p99 {single.get('p99', '-')}s "
+          f"(first call with pool start: {results['first_export_seconds']}s)")
+    print(f"  one render per size        p50 {separate.get('p50', '-')}s  p99 {separate.get('p99', '-')}s")
+    print(f"\n  {'file':<18} {'KB':>8} {'vs screenshot':>14}")
+    for name, size in results['export_bytes'].items():
+        screenshot = results['screenshot_bytes'].get(name.rsplit('.', 1)[0])
+        ratio = f"{size / screenshot:.0%}" if screenshot else '-'
+        print(f"  {name:<18} {size // 1024:>8} {ratio:>14}")
+    print(f"\n  peak RSS {results['peak_rss_mb']} MB")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the infographic export stage.")
+    parser.add_argument('--backend', choices=BACKENDS, default='svg', help="Renderer that makes the capture")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Export worker processes")
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--recordings', default=DEFAULT_RECORDINGS, help="Recordings file with the spec to render")
+    parser.add_argument('--output', help="Write the results as JSON to this path")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args)
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""Local stand-ins for OpenAI, Anthropic, YouTube (data and captions) and the PNG renderer.
+
+They replay responses from a recordings file (see benchmarks/recordings/) and
+sleep for configurable latencies, so the pipeline can be benchmarked without
+API keys, network access or a browser. Install them with `install_fakes`.
+"""
+import base64
+import json
+import random
+import struct
+import threading
+import time
+import types
+import zlib
+
+from linkedin_generator.html_stream import APPROX_CHARS_PER_TOKEN
+from linkedin_generator.providers import override_client
+from linkedin_generator.renderer import INFOGRAPHIC_SIZE, set_renderer
+from linkedin_generator.templates import PROMPT_TEMPLATES
+from linkedin_generator.transcripts import TRANSCRIPT_PROMPTS
+
+# ---- LATENCY ----
+
+class Latency:
+    """Time to first byte plus streaming speed, with optional +/- jitter."""
+
+    def __init__(self, first_byte_seconds=0.0, tokens_per_second=0.0, jitter=0.0):
+        self.first_byte_seconds = first_byte_seconds
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+
+    def _scaled(self, seconds):
+        if self.jitter:
+            seconds *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return max(seconds, 0.0)
+
+    def wait_first_byte(self):
+        time.sleep(self._scaled(self.first_byte_seconds))
+
+    def wait_tokens(self, tokens):
+        if self.tokens_per_second:
+            time.sleep(self._scaled(tokens / self.tokens_per_second))
+
+    def to_dict(self):
+        return {
+            'first_byte_seconds': self.first_byte_seconds,
+            'tokens_per_second': self.tokens_per_second,
+            'jitter': self.jitter,
+        }
+
+
+def approx_tokens(text):
+    return max(1, len(text) // APPROX_CHARS_PER_TOKEN)
+
+
+# Used when a recordings file has no transcript responses
+DEFAULT_TRANSCRIPT_NOTES = "- The speaker walks through the problem, the approach and the results in this part."
+DEFAULT_TRANSCRIPT_BRIEF = "The talk covers the problem, the approach taken and the measured results."
+
+# Used when a recordings file has no infographic spec
+DEFAULT_WORKFLOW_SPEC = {
+    "title": "Streaming ML Pipelines Explained",
+    "subtitle": "How the team moved feature computation from nightly batches to a streaming pipeline.",
+    "hook_stat": {"value": "12x", "label": "fresher features for online models"},
+    "steps": [
+        {"title": "Ingest events", "description": "Click and transaction events land in a partitioned log.",
+         "details": ["Kafka", "Avro schemas"]},
+        {"title": "Compute features", "description": "Windowed aggregations run continuously over the stream.",
+         "details": ["Flink", "5-minute windows"]},
+        {"title": "Serve online", "description": "Features are written to a low-latency store read at inference.",
+         "details": ["Redis", "p99 < 10 ms"]},
+        {"title": "Monitor drift", "description": "Feature distributions are compared with training data.",
+         "details": ["PSI alerts"]},
+    ],
+    "metrics": [{"value": "12x", "label": "feature freshness"}, {"value": "-40%", "label": "compute cost"},
+                {"value": "+3.1%", "label": "conversion lift"}],
+    "code": {"language": "python", "snippet": "features = (events\n    .key_by('user_id')\n    .window(minutes=5)\n    .aggregate(count, mean))"},
+    "key_insight": "Fresher features beat bigger models once predictions depend on recent behaviour.",
+    "scheme": "B",
+}
+
+
+# OpenAI caches prompt prefixes of at least 1024 tokens, in 128-token steps
+OPENAI_MIN_CACHED_TOKENS = 1024
+OPENAI_CACHE_INCREMENT = 128
+
+
+def split_chunks(text, chunk_chars=16):
+    return [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)]
+
+# ---- RECORDINGS ----
+
+def load_recordings(path):
+    """Read a recordings file: a video item, one response per template key, the workflow HTML and (optionally) its spec."""
+    with open(path, encoding='utf-8') as f:
+        recordings = json.load(f)
+    missing = [key for key in PROMPT_TEMPLATES if key not in recordings['responses']]
+    if missing:
+        raise ValueError(f"Recordings file {path} has no response for: {', '.join(missing)}")
+    return recordings
+
+
+def solid_png(size=INFOGRAPHIC_SIZE, rgb=(15, 23, 42)):
+    """A valid single-colour PNG the size of a real infographic."""
+    width, height = size
+    row = b'\x00' + bytes(rgb) * width
+    raw = zlib.compress(row * height, 6)
+
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+    header = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
+    return b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', header) + chunk(b'IDAT', raw) + chunk(b'IEND', b'')
+
+# ---- OPENAI ----
+
+class FakeOpenAI:
+    """Answers `chat.completions.create` with the recorded response of the matching template.
+
+    Transcript map and reduce prompts get the recorded `transcript_notes` and
+    `transcript_brief` responses, or short defaults.
+    """
+
+    def __init__(self, responses, latency):
+        self.responses = dict(responses)
+        self.responses.setdefault('transcript_notes', DEFAULT_TRANSCRIPT_NOTES)
+        self.responses.setdefault('transcript_brief', DEFAULT_TRANSCRIPT_BRIEF)
+        self.latency = latency
+        # The literal text before a template's first placeholder identifies it
+        self._prefixes = {
+            key: template.prompt.template.split('$')[0].strip()
+            for key, template in PROMPT_TEMPLATES.items()
+        }
+        self._prefixes['transcript_notes'] = TRANSCRIPT_PROMPTS['map'].template.split('$')[0].strip()
+        self._prefixes['transcript_brief'] = TRANSCRIPT_PROMPTS['reduce'].template.split('$')[0].strip()
+        self.calls = 0
+        self._lock = threading.Lock()
+        self._seen_prefixes = set()
+        self.chat = types.SimpleNamespace(completions=types.SimpleNamespace(create=self._create))
+
+    def _match(self, prompt):
+        for key, prefix in self._prefixes.items():
+            if prefix and prompt.startswith(prefix):
+                return self.responses[key]
+        raise KeyError("No recorded response matches this prompt")
+
+    def _cached_tokens(self, model, messages):
+        """Simulate automatic prefix caching: a repeated system message of 1024+ tokens is served from cache."""
+        if len(messages) < 2 or messages[0]['role'] != 'system':
+            return 0
+        tokens = approx_tokens(messages[0]['content'])
+        if tokens < OPENAI_MIN_CACHED_TOKENS:
+            return 0
+        key = (model, messages[0]['content'])
+        with self._lock:
+            if key not in self._seen_prefixes:
+                self._seen_prefixes.add(key)
+                return 0
+        return tokens - tokens % OPENAI_CACHE_INCREMENT
+
+    def _create(self, model, messages, temperature=None, stream=False, stream_options=None,
+                response_format=None, **kwargs):
+        with self._lock:
+            self.calls += 1
+        # The template's prompt follows the shared system prefix
+        prompt = messages[-1]['content']
+        if response_format is not None:
+            # Combined mode: every template's recorded response in one JSON object
+            content = json.dumps({key: self.responses[key] for key in PROMPT_TEMPLATES})
+        else:
+            content = self._match(prompt)
+        usage = types.SimpleNamespace(
+            prompt_tokens=sum(approx_tokens(message['content']) for message in messages),
+            completion_tokens=approx_tokens(content),
+            prompt_tokens_details=types.SimpleNamespace(cached_tokens=self._cached_tokens(model, messages))
+        )
+
+        self.latency.wait_first_byte()
+        if stream:
+            return self._stream(content, usage, stream_options)
+        self.latency.wait_tokens(usage.completion_tokens)
+        message = types.SimpleNamespace(content=content)
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=message)], usage=usage)
+
+    def _stream(self, content, usage, stream_options):
+        for text in split_chunks(content):
+            self.latency.wait_tokens(approx_tokens(text))
+            delta = types.SimpleNamespace(content=text)
+            yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)], usage=None)
+        if stream_options and stream_options.get('include_usage'):
+            yield types.SimpleNamespace(choices=[], usage=usage)
+
+# ---- ANTHROPIC ----
+
+class _FakeMessageStream:
+    def __init__(self, html, usage, latency, max_tokens):
+        self._html = html
+        self._latency = latency
+        self._usage = usage
+        self._max_tokens = max_tokens
+        self.current_message_snapshot = types.SimpleNamespace(usage=self._usage, stop_reason=None)
+
+    def __enter__(self):
+        self._latency.wait_first_byte()
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    @property
+    def text_stream(self):
+        for text in split_chunks(self._html, 64):
+            tokens = approx_tokens(text)
+            if self._usage.output_tokens + tokens > self._max_tokens:
+                self.current_message_snapshot.stop_reason = 'max_tokens'
+                return
+            self._latency.wait_tokens(tokens)
+            self._usage.output_tokens += tokens
+            yield text
+        self.current_message_snapshot.stop_reason = 'end_turn'
+
+
+class FakeAnthropic:
+    """Streams the recorded workflow HTML from `messages.stream`.
+
+    Content blocks marked with `cache_control` are cache breakpoints: the
+    prompt up to a breakpoint is written to the cache on first use and read
+    from it afterwards, and usage is reported the way the real API does.
+    Output stops at `max_tokens` (or the lower `max_output_tokens`, to
+    exercise truncation) with a "max_tokens" stop reason, and a trailing
+    assistant message is treated as a prefill that the document resumes from.
+    `messages.create` answers the forced infographic-spec tool call.
+    """
+
+    def __init__(self, workflow_html, latency, max_output_tokens=0, workflow_spec=None):
+        self.workflow_html = workflow_html
+        self.workflow_spec = workflow_spec or DEFAULT_WORKFLOW_SPEC
+        self.latency = latency
+        self.max_output_tokens = max_output_tokens
+        self._cached_prefixes = set()
+        self._lock = threading.Lock()
+        self.messages = types.SimpleNamespace(stream=self._stream, create=self._create)
+
+    def _usage(self, system, messages):
+        blocks = [{'type': 'text', 'text': system}] if isinstance(system, str) else list(system or [])
+        for message in messages:
+            content = message['content']
+            blocks += [{'type': 'text', 'text': content}] if isinstance(content, str) else content
+
+        prefix, cache_read, cache_write, uncached = '', 0, 0, 0
+        for block in blocks:
+            prefix += block.get('text', '')
+            uncached += approx_tokens(block.get('text', ''))
+            if block.get('cache_control'):
+                with self._lock:
+                    hit = prefix in self._cached_prefixes
+                    self._cached_prefixes.add(prefix)
+                if hit:
+                    cache_read += uncached
+                else:
+                    cache_write += uncached
+                uncached = 0
+        return types.SimpleNamespace(input_tokens=uncached, output_tokens=0,
+                                     cache_read_input_tokens=cache_read, cache_creation_input_tokens=cache_write)
+
+    def _continuation(self, prefill):
+        """The rest of the recorded document after the text it was cut off at."""
+        end = self.workflow_html.rfind(prefill[-200:])
+        if end == -1:
+            return '</html>'
+        return self.workflow_html[end + len(prefill[-200:]):]
+
+    def _stream(self, model, max_tokens, messages, system=None, **kwargs):
+        html = self.workflow_html
+        if messages[-1]['role'] == 'assistant':
+            html = self._continuation(messages[-1]['content'])
+        if self.max_output_tokens:
+            max_tokens = min(max_tokens, self.max_output_tokens)
+        return _FakeMessageStream(html, self._usage(system, messages), self.latency, max_tokens)
+
+    def _create(self, model, max_tokens, messages, system=None, tools=None, tool_choice=None, **kwargs):
+        usage = self._usage(system, messages)
+        usage.output_tokens = approx_tokens(json.dumps(self.workflow_spec))
+        self.latency.wait_first_byte()
+        self.latency.wait_tokens(usage.output_tokens)
+        block = types.SimpleNamespace(type='tool_use', name=tool_choice['name'], input=self.workflow_spec)
+        return types.SimpleNamespace(content=[block], usage=usage, stop_reason='tool_use')
+
+# ---- YOUTUBE ----
+
+class _FakeRequest:
+    def __init__(self, result, latency):
+        self._result = result
+        self._latency = latency
+
+    def execute(self, http=None, num_retries=0):
+        self._latency.wait_first_byte()
+        return self._result
+
+
+class FakeYouTube:
+    """Returns the recorded video item under whatever IDs are asked for."""
+
+    def __init__(self, video_item, latency):
+        self.video_item = video_item
+        self.latency = latency
+
+    def videos(self):
+        return self
+
+    def list(self, part, id, maxResults=None, **kwargs):
+        items = []
+        for video_id in id.split(','):
+            item = {'id': video_id}
+            for name in part.split(','):
+                item[name] = self.video_item.get(name, {})
+            items.append(item)
+        return _FakeRequest({'items': items}, self.latency)
+
+class FakeTranscripts:
+    """Returns a synthetic caption track of `minutes` of speech built from the recorded description."""
+
+    WORDS_PER_MINUTE = 150
+    WORDS_PER_SNIPPET = 10
+
+    def __init__(self, video_item, latency, minutes=180):
+        description = video_item.get('snippet', {}).get('description', '')
+        self.words = description.split() or ['machine', 'learning', 'in', 'production']
+        self.latency = latency
+        self.minutes = minutes
+
+    def fetch(self, video_id, languages=('en',)):
+        self.latency.wait_first_byte()
+        return self._snippets()
+
+    def _snippets(self):
+        # Generated lazily, like reading a long caption file
+        total = self.minutes * self.WORDS_PER_MINUTE
+        for start in range(0, total, self.WORDS_PER_SNIPPET):
+            words = [self.words[(start + i) % len(self.words)] for i in range(self.WORDS_PER_SNIPPET)]
+            yield types.SimpleNamespace(text=' '.join(words), start=start / self.WORDS_PER_MINUTE * 60)
+
+# ---- RENDERER ----
+
+class FakeRenderer:
+    """Returns a fixed PNG after the configured render time."""
+
+    def __init__(self, png, latency):
+        self.png = png
+        self.latency = latency
+
+    def render(self, html):
+        self.latency.wait_first_byte()
+        return self.png
+
+
+def install_fakes(recordings, openai_latency, anthropic_latency, youtube_latency, render_latency,
+                  fake_renderer=True, transcript_minutes=180, anthropic_max_output_tokens=0):
+    """Route every provider (and optionally the renderer) to the local fakes."""
+    override_client('openai', FakeOpenAI(recordings['responses'], openai_latency))
+    override_client('anthropic', FakeAnthropic(recordings['workflow_html'], anthropic_latency,
+                                                anthropic_max_output_tokens, recordings.get('workflow_spec')))
+    override_client('youtube', FakeYouTube(recordings['video_item'], youtube_latency))
+    override_client('transcripts', FakeTranscripts(recordings['video_item'], youtube_latency, transcript_minutes))
+    if fake_renderer:
+        png = base64.b64decode(recordings['png_base64']) if recordings.get('png_base64') else solid_png()
+        set_renderer(FakeRenderer(png, render_latency))
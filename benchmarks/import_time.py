@@ -0,0 +1,82 @@
+"""Measure how long it takes to import the Streamlit apps.
+
+Runs `python -X importtime -c "import <module>"` in fresh interpreters and
+reports the total import time plus the most expensive top-level packages.
+Results can be written as JSON and committed next to earlier runs to track
+cold-start regressions.
+
+Usage:
+    python benchmarks/import_time.py --module TMLS_Video_Processor --runs 5 --output import_time.json
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# "import time: self [us] | cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure_once(module):
+    """Return {top-level package: cumulative microseconds} and the total for one fresh import."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    packages = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        cumulative, indent, name = int(match.group(2)), match.group(3), match.group(4)
+        # Only first-level imports; their cumulative time already includes children
+        if len(indent) == 1:
+            top = name.split('.')[0]
+            packages[top] = packages.get(top, 0) + cumulative
+    return packages, sum(packages.values())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure app import time.")
+    parser.add_argument('--module', default='TMLS_Video_Processor', help="Module to import")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help="How many packages to list")
+    parser.add_argument('--output', help="Write the results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    totals = []
+    per_package = {}
+    for _ in range(args.runs):
+        packages, total = measure_once(args.module)
+        totals.append(total)
+        for name, micros in packages.items():
+            per_package.setdefault(name, []).append(micros)
+
+    medians = {name: statistics.median(values) for name, values in per_package.items()}
+    slowest = sorted(medians.items(), key=lambda item: item[1], reverse=True)[:args.top]
+
+    print(f"import {args.module}: median {statistics.median(totals) / 1000:.1f} ms over {args.runs} runs")
+    for name, micros in slowest:
+        print(f"  {name:<30} {micros / 1000:>8.1f} ms")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({
+                'module': args.module,
+                'python': sys.version.split()[0],
+                'runs': args.runs,
+                'median_total_ms': statistics.median(totals) / 1000,
+                'slowest_packages_ms': {name: micros / 1000 for name, micros in slowest},
+            }, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
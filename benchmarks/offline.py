@@ -0,0 +1,334 @@
+"""Benchmark the pipeline offline against recorded-response fakes.
+
+OpenAI, Anthropic, YouTube and the PNG renderer are replaced by the local
+stand-ins in benchmarks/fakes.py, which replay a recordings file with
+configurable latency. Each phase runs in a fresh interpreter so its peak RSS
+is its own, and reports wall time, throughput, and p50/p99 per stage for N
+videos, plus the share of prompt tokens served from the (simulated) provider
+prompt caches. The `transcript` phase summarizes a synthetic caption track
+of --transcript-minutes per video. Results are written as JSON so runs can
+be compared across commits.
+
+Usage:
+    python benchmarks/offline.py --videos 20 --workers 4 --output bench.json
+    python benchmarks/offline.py --openai-latency 0.8 --openai-tps 60 --anthropic-latency 2 --anthropic-tps 80
+    python benchmarks/offline.py --compare baseline.json bench.json
+    python benchmarks/offline.py --phases workflow --anthropic-max-output-tokens 500
+    python benchmarks/offline.py --phases workflow end_to_end --workflow-mode spec
+
+    # Capture a new recordings file from the live APIs (needs API keys)
+    python benchmarks/offline.py --record "https://www.youtube.com/watch?v=..." --recordings my_talk.json
+"""
+import argparse
+import contextvars
+import datetime
+import json
+import math
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# ---- CONFIGURATION ----
+
+DEFAULT_RECORDINGS = os.path.join(ROOT, "benchmarks", "recordings", "tmls_talk.json")
+
+PHASES = ('posts', 'workflow', 'png', 'transcript', 'end_to_end')
+
+# Options forwarded to every phase subprocess: (flag, attribute)
+PHASE_OPTIONS = [
+    ('--recordings', 'recordings'),
+    ('--videos', 'videos'),
+    ('--workers', 'workers'),
+    ('--openai-latency', 'openai_latency'),
+    ('--openai-tps', 'openai_tps'),
+    ('--anthropic-latency', 'anthropic_latency'),
+    ('--anthropic-tps', 'anthropic_tps'),
+    ('--youtube-latency', 'youtube_latency'),
+    ('--render-latency', 'render_latency'),
+    ('--jitter', 'jitter'),
+    ('--transcript-minutes', 'transcript_minutes'),
+    ('--anthropic-max-output-tokens', 'anthropic_max_output_tokens'),
+    ('--workflow-mode', 'workflow_mode'),
+]
+
+# ---- STATISTICS ----
+
+def percentile(values, p):
+    """Nearest-rank percentile."""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(values):
+    if not values:
+        return {'count': 0}
+    return {
+        'count': len(values),
+        'p50': round(percentile(values, 50), 4),
+        'p99': round(percentile(values, 99), 4),
+        'mean': round(statistics.mean(values), 4),
+        'max': round(max(values), 4),
+    }
+
+
+def rounded(value, digits=3):
+    return None if value is None else round(value, digits)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, or None where `resource` is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+# ---- PHASES ----
+
+def run_phase(phase, args):
+    """Run one phase in this process against the fakes and return its measurements."""
+    from benchmarks.fakes import Latency, install_fakes, load_recordings
+    from linkedin_generator import pipeline, transcripts
+    from linkedin_generator.metrics import cached_prompt_ratio, collect_stages
+    from linkedin_generator.youtube_cache import YouTubeCache
+
+    recordings = load_recordings(args.recordings)
+    install_fakes(
+        recordings,
+        openai_latency=Latency(args.openai_latency, args.openai_tps, args.jitter),
+        anthropic_latency=Latency(args.anthropic_latency, args.anthropic_tps, args.jitter),
+        youtube_latency=Latency(args.youtube_latency, 0, args.jitter),
+        render_latency=Latency(args.render_latency, 0, args.jitter),
+        fake_renderer=not args.real_renderer,
+        transcript_minutes=args.transcript_minutes,
+        anthropic_max_output_tokens=args.anthropic_max_output_tokens
+    )
+    # Every video ID misses empty caches, so the YouTube and transcript stages are always exercised
+    cache_dir = tempfile.mkdtemp(prefix="bench-")
+    pipeline.youtube_cache = YouTubeCache(path=os.path.join(cache_dir, "youtube.sqlite3"))
+    transcripts.brief_cache = transcripts.BriefCache(path=os.path.join(cache_dir, "transcripts.sqlite3"))
+
+    recorded_content = pipeline.build_video_content(recordings['video_item'])
+    workflow_html = recordings['workflow_html']
+
+    def process(video_id):
+        video_url = f"https://www.youtube.com/watch?v={video_id}"
+        if phase == 'posts':
+            pipeline.generate_all_template_posts(recorded_content, video_url, fresh=True)
+        elif phase == 'workflow':
+            pipeline.generate_workflow_html(recorded_content, mode=args.workflow_mode)
+        elif phase == 'png':
+            pipeline.html_to_image_simple(workflow_html)
+        elif phase == 'transcript':
+            pipeline.add_transcript_brief(video_id, recorded_content, fresh=True)
+        else:
+            video_content = pipeline.fetch_video_content(video_id)
+            pipeline.generate_all_template_posts(video_content, video_url, fresh=True)
+            html = pipeline.generate_workflow_html(video_content, mode=args.workflow_mode)
+            pipeline.html_to_image_simple(html)
+
+    def timed(video_id):
+        started = time.perf_counter()
+        process(video_id)
+        return time.perf_counter() - started
+
+    video_ids = [f"bench{i:05d}" for i in range(args.videos)]
+    with collect_stages() as spans:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            # Copy the context here, not in the worker, so every stage span lands in `spans`
+            futures = [executor.submit(contextvars.copy_context().run, timed, video_id) for video_id in video_ids]
+            per_video = [future.result() for future in futures]
+        wall_seconds = time.perf_counter() - started
+
+    stages = {}
+    for span in spans:
+        stages.setdefault(span['stage'], []).append(span)
+    return {
+        'phase': phase,
+        'videos': args.videos,
+        'workers': args.workers,
+        'wall_seconds': round(wall_seconds, 3),
+        'videos_per_second': round(args.videos / wall_seconds, 3) if wall_seconds else None,
+        'per_video_seconds': summarize(per_video),
+        'stages': {
+            stage: dict(
+                summarize([span['seconds'] for span in stage_spans]),
+                errors=sum(span['status'] != 'ok' for span in stage_spans),
+                repairs=sum(len(span['repairs']) for span in stage_spans),
+                cached_prompt_ratio=rounded(cached_prompt_ratio(stage_spans))
+            )
+            for stage, stage_spans in sorted(stages.items())
+        },
+        'peak_rss_mb': peak_rss_mb(),
+    }
+
+
+def run_phase_subprocess(phase, args):
+    """Run a phase in a fresh interpreter so peak RSS is measured per phase."""
+    command = [sys.executable, os.path.abspath(__file__), '--phase', phase]
+    for flag, attribute in PHASE_OPTIONS:
+        command += [flag, str(getattr(args, attribute))]
+    if args.real_renderer:
+        command.append('--real-renderer')
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+# ---- RECORDING ----
+
+def record(url, path):
+    """Call the live APIs once for `url` and save the responses as a recordings file."""
+    from linkedin_generator import pipeline
+    from linkedin_generator.providers import execute_youtube, get_openai_client, get_youtube_client
+    from linkedin_generator.templates import PROMPT_TEMPLATES, run_template
+
+    video_id = pipeline.get_youtube_id(url)
+    items = execute_youtube(get_youtube_client().videos().list(part='snippet,statistics', id=video_id))['items']
+    if not items:
+        sys.exit(f"Could not fetch {url}")
+    video_item = items[0]
+    video_content = pipeline.build_video_content(video_item)
+
+    responses = {
+        key: run_template(get_openai_client(), template, video_content, url, fresh=True)
+        for key, template in PROMPT_TEMPLATES.items()
+    }
+    workflow_html = pipeline.generate_workflow_html(video_content)
+    if workflow_html.startswith("Error generating workflow"):
+        sys.exit(workflow_html)
+    workflow_spec = pipeline.generate_workflow_spec(video_content)
+
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            'source': url,
+            'recorded_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'video_item': {'snippet': video_item['snippet'], 'statistics': video_item.get('statistics', {})},
+            'responses': responses,
+            'workflow_html': workflow_html,
+            'workflow_spec': workflow_spec,
+        }, f, indent=2, ensure_ascii=False)
+    print(f"✅ Recorded {len(responses)} responses, the workflow HTML and its spec to {path}", file=sys.stderr)
+
+# ---- REPORTING ----
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    for phase in results['phases'].values():
+        print(f"\n{phase['phase']}: {phase['videos']} videos in {phase['wall_seconds']}s "
+              f"({phase['videos_per_second']} videos/s, peak RSS {phase['peak_rss_mb']} MB)")
+        print(f"  {'stage':<28} {'count':>6} {'p50 s':>8} {'p99 s':>8} {'errors':>7} {'repairs':>8} {'cached':>7}")
+        for stage, summary in phase['stages'].items():
+            ratio = summary.get('cached_prompt_ratio')
+            cached = '-' if ratio is None else f"{ratio:.0%}"
+            print(f"  {stage:<28} {summary['count']:>6} {summary['p50']:>8} {summary['p99']:>8} "
+                  f"{summary['errors']:>7} {summary.get('repairs', 0):>8} {cached:>7}")
+
+
+def compare(baseline_path, current_path):
+    """Print how wall time, throughput and per-stage p50/p99 changed between two result files."""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(current_path, encoding='utf-8') as f:
+        current = json.load(f)
+
+    def change(old, new):
+        if not old or new is None:
+            return "n/a"
+        return f"{(new - old) / old:+.1%}"
+
+    print(f"{baseline.get('commit')} -> {current.get('commit')}")
+    for name, phase in current['phases'].items():
+        before = baseline['phases'].get(name)
+        if not before:
+            continue
+        print(f"\n{name}: wall {change(before['wall_seconds'], phase['wall_seconds'])}, "
+              f"throughput {change(before['videos_per_second'], phase['videos_per_second'])}, "
+              f"peak RSS {change(before['peak_rss_mb'], phase['peak_rss_mb'])}")
+        for stage, summary in phase['stages'].items():
+            old = before['stages'].get(stage)
+            if old and old.get('count') and summary.get('count'):
+                print(f"  {stage:<28} p50 {change(old['p50'], summary['p50']):>8}  p99 {change(old['p99'], summary['p99']):>8}")
+
+# ---- MAIN ----
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--recordings', default=DEFAULT_RECORDINGS, help="Recorded responses to replay")
+    parser.add_argument('--videos', type=int, default=20, help="Videos processed per phase")
+    parser.add_argument('--workers', type=int, default=4, help="Videos processed in parallel")
+    parser.add_argument('--phases', nargs='+', choices=PHASES, default=list(PHASES))
+    parser.add_argument('--openai-latency', type=float, default=0.5, help="Seconds to first token per GPT-4o call")
+    parser.add_argument('--openai-tps', type=float, default=80, help="GPT-4o output tokens per second (0 = instant)")
+    parser.add_argument('--anthropic-latency', type=float, default=1.0, help="Seconds to first token per Claude call")
+    parser.add_argument('--anthropic-tps', type=float, default=70, help="Claude output tokens per second (0 = instant)")
+    parser.add_argument('--youtube-latency', type=float, default=0.15, help="Seconds per YouTube API call")
+    parser.add_argument('--render-latency', type=float, default=1.0, help="Seconds per fake PNG render")
+    parser.add_argument('--jitter', type=float, default=0.2, help="Random +/- fraction applied to every latency")
+    parser.add_argument('--transcript-minutes', type=int, default=180,
+                        help="Length of the synthetic talk summarized by the transcript phase")
+    parser.add_argument('--workflow-mode', choices=('html', 'spec'), default='html',
+                        help="Infographic generation mode: Claude writes the HTML, or a JSON spec rendered locally")
+    parser.add_argument('--anthropic-max-output-tokens', type=int, default=0,
+                        help="Cut Claude responses off after this many tokens to exercise continuations (0 = off)")
+    parser.add_argument('--real-renderer', action='store_true',
+                        help="Render PNGs with the configured local renderer instead of the fake")
+    parser.add_argument('--output', help="Write the results as JSON to this path")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help="Compare two result files")
+    parser.add_argument('--record', metavar='URL', help="Record live responses for URL into --recordings")
+    parser.add_argument('--phase', choices=PHASES, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if args.record:
+        record(args.record, args.recordings)
+        return
+    if args.phase:
+        # Internal: one phase in this interpreter, result on stdout for the parent
+        print(json.dumps(run_phase(args.phase, args)))
+        return
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'config': {attribute: getattr(args, attribute) for _, attribute in PHASE_OPTIONS},
+        'phases': {},
+    }
+    results['config']['real_renderer'] = args.real_renderer
+    results['config']['recordings'] = os.path.relpath(args.recordings, ROOT)
+    for phase in args.phases:
+        results['phases'][phase] = run_phase_subprocess(phase, args)
+
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
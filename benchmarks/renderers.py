@@ -0,0 +1,134 @@
+"""Compare the infographic PNG renderers: browser-free svg against Html2Image and Playwright.
+
+Each backend runs in a fresh interpreter that renders the same compact-mode
+infographic (the spec from the recordings file) `--renders` times after a
+first, untimed-for-throughput render. Reported per backend: startup (creating
+the renderer plus the first render), p50/p99 of the later renders, PNG size,
+and the peak RSS of the interpreter and of its finished child processes
+(Chromium for Html2Image). Playwright's browser is still running when the
+interpreter reports, so only its Python side is counted.
+
+Usage:
+    python benchmarks/renderers.py --renders 10
+    python benchmarks/renderers.py --backends svg html2image playwright --output renderers.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.offline import DEFAULT_RECORDINGS, git_commit, peak_rss_mb, rounded, summarize
+
+# ---- CONFIGURATION ----
+
+BACKENDS = ('svg', 'html2image', 'playwright')
+
+# ---- MEASUREMENT ----
+
+def children_peak_rss_mb():
+    """Peak RSS of the largest finished child process, or None where `resource` is unavailable."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    divisor = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return round(peak / divisor, 1)
+
+
+def run_backend(backend, args):
+    """Render the recorded infographic with one backend in this process and return its measurements."""
+    from benchmarks.fakes import DEFAULT_WORKFLOW_SPEC, load_recordings
+    from linkedin_generator.infographic import normalize_spec, render_infographic
+    from linkedin_generator.pipeline import build_video_content
+    from linkedin_generator.renderer import create_renderer
+
+    recordings = load_recordings(args.recordings)
+    spec = normalize_spec(recordings.get('workflow_spec') or DEFAULT_WORKFLOW_SPEC)
+    html = render_infographic(spec, build_video_content(recordings['video_item']))
+
+    started = time.perf_counter()
+    renderer = create_renderer(backend)
+    png = renderer.render(html)
+    startup_seconds = time.perf_counter() - started
+
+    durations = []
+    for _ in range(args.renders):
+        started = time.perf_counter()
+        renderer.render(html)
+        durations.append(time.perf_counter() - started)
+    return {
+        'backend': backend,
+        'startup_seconds': rounded(startup_seconds),
+        'render_seconds': summarize(durations),
+        'png_bytes': len(png),
+        'peak_rss_mb': peak_rss_mb(),
+        'children_peak_rss_mb': children_peak_rss_mb(),
+    }
+
+
+def run_backend_subprocess(backend, args):
+    """Run one backend in a fresh interpreter so its peak RSS is measured on its own."""
+    command = [sys.executable, os.path.abspath(__file__), '--backend', backend,
+               '--renders', str(args.renders), '--recordings', args.recordings]
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        # Typically a missing browser or package; report it instead of aborting the comparison
+        lines = result.stderr.strip().splitlines()
+        return {'backend': backend, 'error': lines[-1] if lines else f"exit status {result.returncode}"}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+# ---- REPORTING ----
+
+def print_results(results):
+    print(f"\n{results['renders']} renders per backend")
+    print(f"  {'backend':<12} {'startup s':>10} {'p50 s':>8} {'p99 s':>8} {'PNG KB':>8} {'RSS MB':>8} {'child MB':>9}")
+    for result in results['backends'].values():
+        if 'error' in result:
+            print(f"  {result['backend']:<12} failed: {result['error']}")
+            continue
+        timings = result['render_seconds']
+        print(f"  {result['backend']:<12} {result['startup_seconds']:>10} {timings.get('p50', '-'):>8} "
+              f"{timings.get('p99', '-'):>8} {result['png_bytes'] // 1024:>8} {result['peak_rss_mb']:>8} "
+              f"{result['children_peak_rss_mb']:>9}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the infographic PNG renderers.")
+    parser.add_argument('--backends', nargs='+', choices=BACKENDS, default=['svg', 'html2image'])
+    parser.add_argument('--renders', type=int, default=10, help="Timed renders per backend after the first")
+    parser.add_argument('--recordings', default=DEFAULT_RECORDINGS, help="Recordings file with the spec to render")
+    parser.add_argument('--output', help="Write the results as JSON to this path")
+    parser.add_argument('--backend', choices=BACKENDS, help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.backend:
+        # Internal: one backend in this interpreter, result on stdout for the parent
+        print(json.dumps(run_backend(args.backend, args)))
+        return
+
+    results = {
+        'commit': git_commit(),
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'renders': args.renders,
+        'backends': {backend: run_backend_subprocess(backend, args) for backend in args.backends},
+    }
+    print_results(results)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
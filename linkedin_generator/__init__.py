@@ -0,0 +1,5 @@
+"""Shared building blocks for the LinkedIn content generator apps."""
+from dotenv import load_dotenv
+
+# Settings are read from the environment at import time, so load .env first
+load_dotenv()
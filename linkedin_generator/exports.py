@@ -0,0 +1,193 @@
+"""Size variants and compact encodings of a rendered infographic.
+
+The infographic is rendered once at 1200x1200. Every export is derived from
+that capture without another browser round trip:
+
+- `square` (1200x1200), `portrait` (1080x1350) and `link_card` (1200x627)
+  images, each in every format of EXPORT_FORMATS. The capture is scaled to
+  fit and the remaining bands are filled with the average color of the
+  nearest edge, which is plain page background.
+- `carousel.pdf`, a LinkedIn document post: the whole infographic on a
+  portrait page, then its upper and lower halves at full size.
+
+Browser screenshots are lossless truecolor PNGs. PNG exports are quantized
+to a 256-color palette and written with the optimizing encoder; WebP and
+JPEG exports are lossy. Encoding is CPU-bound, so the sizes are encoded in
+parallel by a pool of worker processes.
+"""
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+# ---- CONFIGURATION ----
+
+EXPORT_VARIANTS = {
+    'square': (1200, 1200),
+    'portrait': (1080, 1350),
+    'link_card': (1200, 627),
+}
+CAROUSEL_NAME = 'carousel.pdf'
+CAROUSEL_PAGE_SIZE = EXPORT_VARIANTS['portrait']
+# Detail pages after the carousel cover; each shows one horizontal band of the infographic
+CAROUSEL_DETAIL_PAGES = int(os.getenv("CAROUSEL_DETAIL_PAGES", "2"))
+CAROUSEL_BAND_OVERLAP = 40
+
+IMAGE_FORMATS = ('png', 'webp', 'jpeg')
+EXPORT_FORMATS = tuple(
+    fmt.strip() for fmt in os.getenv("EXPORT_FORMATS", "png,webp,jpeg").split(',') if fmt.strip()
+)
+EXTENSIONS = {'png': 'png', 'webp': 'webp', 'jpeg': 'jpg'}
+MIME_TYPES = {'png': 'image/png', 'webp': 'image/webp', 'jpg': 'image/jpeg', 'pdf': 'application/pdf'}
+
+EXPORT_PNG_COLORS = int(os.getenv("EXPORT_PNG_COLORS", "256"))
+EXPORT_WEBP_QUALITY = int(os.getenv("EXPORT_WEBP_QUALITY", "85"))
+EXPORT_JPEG_QUALITY = int(os.getenv("EXPORT_JPEG_QUALITY", "85"))
+
+# Encoder processes; 1 encodes in the calling process
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# ---- COMPOSITION ----
+
+def edge_color(edge):
+    """Average color of a one-pixel row or column."""
+    from PIL import Image
+
+    return edge.resize((1, 1), Image.Resampling.BOX).getpixel((0, 0))
+
+
+def fit_to(image, size):
+    """Scale `image` to fit inside `size` and fill the rest with solid colors taken from its edges."""
+    from PIL import Image
+
+    width, height = size
+    scale = min(width / image.width, height / image.height)
+    if scale == 1 and image.size == size:
+        return image
+    scaled = image.resize((round(image.width * scale), round(image.height * scale)), Image.Resampling.LANCZOS)
+    if scaled.size == size:
+        return scaled
+
+    left, top = (width - scaled.width) // 2, (height - scaled.height) // 2
+    # Solid bands: stretching edge pixels turns small gradient steps into visible stripes
+    if top > 0:
+        # Top half in the first row's color, bottom half in the last's; the scaled image covers the seam
+        canvas = Image.new('RGB', size, edge_color(scaled.crop((0, scaled.height - 1, scaled.width, scaled.height))))
+        canvas.paste(edge_color(scaled.crop((0, 0, scaled.width, 1))), (0, 0, width, height // 2))
+    else:
+        canvas = Image.new('RGB', size, edge_color(scaled.crop((scaled.width - 1, 0, scaled.width, scaled.height))))
+        canvas.paste(edge_color(scaled.crop((0, 0, 1, scaled.height))), (0, 0, width // 2, height))
+    canvas.paste(scaled, (left, top))
+    return canvas
+
+
+def carousel_pages(capture):
+    """The carousel cover followed by CAROUSEL_DETAIL_PAGES overlapping bands of the capture."""
+    from PIL import Image
+
+    pages = [fit_to(capture, CAROUSEL_PAGE_SIZE)]
+    width, height = CAROUSEL_PAGE_SIZE
+    # The top row is pure page background
+    background = Image.new('RGB', CAROUSEL_PAGE_SIZE, edge_color(capture.crop((0, 0, capture.width, 1))))
+    band_height = capture.height // max(CAROUSEL_DETAIL_PAGES, 1)
+    for index in range(CAROUSEL_DETAIL_PAGES):
+        top = max(index * band_height - CAROUSEL_BAND_OVERLAP, 0)
+        bottom = min((index + 1) * band_height + CAROUSEL_BAND_OVERLAP, capture.height)
+        band = capture.crop((0, top, capture.width, bottom))
+        scale = min(width / band.width, height / band.height)
+        band = band.resize((round(band.width * scale), round(band.height * scale)), Image.Resampling.LANCZOS)
+        page = background.copy()
+        page.paste(band, ((width - band.width) // 2, (height - band.height) // 2))
+        pages.append(page)
+    return pages
+
+# ---- ENCODING ----
+
+def encode_image(image, fmt):
+    """Encode an RGB image as an optimized PNG, WebP or JPEG."""
+    from PIL import Image
+
+    output = io.BytesIO()
+    if fmt == 'png':
+        # A palette keeps flat UI colors exact; dithering hides banding in the gradients
+        palette = image.quantize(EXPORT_PNG_COLORS, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.FLOYDSTEINBERG)
+        palette.save(output, 'PNG', optimize=True)
+    elif fmt == 'webp':
+        image.save(output, 'WEBP', quality=EXPORT_WEBP_QUALITY, method=4)
+    elif fmt == 'jpeg':
+        image.save(output, 'JPEG', quality=EXPORT_JPEG_QUALITY, optimize=True, progressive=True)
+    else:
+        raise ValueError(f"Unknown export format '{fmt}'")
+    return output.getvalue()
+
+
+def _open_capture(png_bytes):
+    from PIL import Image
+
+    return Image.open(io.BytesIO(png_bytes)).convert('RGB')
+
+
+def export_variant(png_bytes, variant, formats):
+    """Worker task: one size variant of the capture, scaled once and encoded in every format."""
+    image = fit_to(_open_capture(png_bytes), EXPORT_VARIANTS[variant])
+    return {export_name(variant, fmt): encode_image(image, fmt) for fmt in formats}
+
+
+def export_carousel(png_bytes):
+    """Worker task: the carousel as a multi-page PDF with JPEG-compressed pages."""
+    cover, *details = carousel_pages(_open_capture(png_bytes))
+    output = io.BytesIO()
+    cover.save(output, 'PDF', save_all=True, append_images=details, resolution=144.0, quality=EXPORT_JPEG_QUALITY)
+    return {CAROUSEL_NAME: output.getvalue()}
+
+# ---- SHARED POOL ----
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_export_executor():
+    """Return the process pool shared by every export, starting it on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Spawned, not forked: the apps, the service and batch.py all run threads that may hold locks
+            _executor = ProcessPoolExecutor(max_workers=EXPORT_WORKERS, mp_context=multiprocessing.get_context('spawn'))
+        return _executor
+
+
+def export_name(variant, fmt):
+    return f"{variant}.{EXTENSIONS[fmt]}"
+
+
+def mime_type(name):
+    return MIME_TYPES[name.rsplit('.', 1)[-1]]
+
+
+def export_images(png_bytes, formats=None, variants=None, carousel=True):
+    """Derive every export from one rendered PNG; returns `{file name: bytes}` in a stable order.
+
+    `formats` and `variants` default to EXPORT_FORMATS and every entry of
+    EXPORT_VARIANTS. Sizes are encoded in parallel by the worker pool.
+    """
+    formats = EXPORT_FORMATS if formats is None else formats
+    variants = list(EXPORT_VARIANTS) if variants is None else variants
+    for fmt in formats:
+        if fmt not in IMAGE_FORMATS:
+            raise ValueError(f"Unknown export format '{fmt}'")
+    for variant in variants:
+        if variant not in EXPORT_VARIANTS:
+            raise ValueError(f"Unknown export variant '{variant}'")
+
+    # One task per size: the capture is decoded and scaled once for all of its formats
+    tasks = [(export_variant, png_bytes, variant, formats) for variant in variants]
+    if carousel:
+        tasks.append((export_carousel, png_bytes))
+
+    if EXPORT_WORKERS <= 1:
+        results = [func(*args) for func, *args in tasks]
+    else:
+        executor = get_export_executor()
+        results = [future.result() for future in [executor.submit(func, *args) for func, *args in tasks]]
+    return {name: data for files in results for name, data in files.items()}
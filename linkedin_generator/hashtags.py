@@ -0,0 +1,127 @@
+"""Local hashtag engine: TF-IDF matching of video text against a curated tag vocabulary.
+
+Each curated hashtag is a "document" made of its signal phrases. Phrases
+(1-3 word n-grams) form the vocabulary, weighted by inverse document
+frequency so phrases shared by many tags count for less. A video's title and
+description are projected onto the same vocabulary and scored against every
+tag with one matrix-vector product.
+"""
+import os
+import re
+import threading
+
+import numpy as np
+import yaml
+
+# ---- CONFIGURATION ----
+
+HASHTAGS_PATH = os.getenv(
+    "HASHTAGS_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "hashtags.yaml")
+)
+
+# Minimum cosine score for a topic tag to be picked
+HASHTAG_MIN_SCORE = float(os.getenv("HASHTAG_MIN_SCORE", "0.15"))
+
+# Fewer confident topic tags than this and the caller should ask the LLM instead
+MIN_TOPIC_TAGS = 2
+MAX_TOPIC_TAGS = 5
+
+# Title words say more about the topic than description boilerplate
+TITLE_WEIGHT = 3
+
+MAX_NGRAM = 3
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# ---- TEXT ----
+
+def tokenize(text):
+    """Lowercase words with simple plural folding ("models" -> "model")."""
+    return [
+        word[:-1] if len(word) > 3 and word.endswith('s') and not word.endswith('ss') else word
+        for word in _WORD.findall(text.lower())
+    ]
+
+
+def ngrams(tokens, max_n=MAX_NGRAM):
+    for n in range(1, max_n + 1):
+        for i in range(len(tokens) - n + 1):
+            yield ' '.join(tokens[i:i + n])
+
+# ---- INDEX ----
+
+class HashtagIndex:
+    """Precomputed, L2-normalized TF-IDF matrix of curated tags over their signal phrases."""
+
+    def __init__(self, tags, always=()):
+        self.always = list(always)
+        self.tags = list(tags)
+
+        phrases = [{' '.join(tokenize(phrase)) for phrase in tags[tag]} - {''} for tag in self.tags]
+        self.vocabulary = {term: i for i, term in enumerate(sorted(set().union(*phrases)))}
+
+        document_frequency = np.zeros(len(self.vocabulary))
+        for tag_phrases in phrases:
+            for phrase in tag_phrases:
+                document_frequency[self.vocabulary[phrase]] += 1
+        self.idf = np.log((1 + len(self.tags)) / (1 + document_frequency)) + 1
+
+        matrix = np.zeros((len(self.tags), len(self.vocabulary)))
+        for row, tag_phrases in enumerate(phrases):
+            for phrase in tag_phrases:
+                matrix[row, self.vocabulary[phrase]] = self.idf[self.vocabulary[phrase]]
+        self.matrix = matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+    @classmethod
+    def load(cls, path=HASHTAGS_PATH):
+        with open(path, encoding='utf-8') as f:
+            config = yaml.safe_load(f)
+        return cls(config['tags'], config.get('always', ()))
+
+    def vectorize(self, title, description):
+        """TF-IDF vector of the video text over the tag vocabulary."""
+        counts = np.zeros(len(self.vocabulary))
+        for text, weight in ((title, TITLE_WEIGHT), (description, 1)):
+            for term in ngrams(tokenize(text or '')):
+                index = self.vocabulary.get(term)
+                if index is not None:
+                    counts[index] += weight
+        vector = np.where(counts > 0, 1 + np.log(np.maximum(counts, 1)), 0.0) * self.idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def score(self, title, description):
+        """Return `[(tag, score)]` for every curated tag, best first."""
+        scores = self.matrix @ self.vectorize(title, description)
+        order = np.argsort(-scores, kind='stable')
+        return [(self.tags[i], float(scores[i])) for i in order]
+
+    def suggest(self, title, description, min_score=HASHTAG_MIN_SCORE, max_tags=MAX_TOPIC_TAGS):
+        """Return the `always` tags plus up to `max_tags` confident topic tags, and the topic tags alone."""
+        topic = [
+            tag for tag, score in self.score(title, description)
+            if score >= min_score and tag not in self.always
+        ][:max_tags]
+        return self.always + topic, topic
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_index():
+    """Return the process-wide index, built on first use."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = HashtagIndex.load()
+        return _index
+
+
+def suggest_hashtags(video_content):
+    """Hashtag line for a video, or None when too few topic tags are confident."""
+    tags, topic = get_index().suggest(video_content['title'], video_content.get('description', ''))
+    if len(topic) < MIN_TOPIC_TAGS:
+        return None
+    return ' '.join(tags)
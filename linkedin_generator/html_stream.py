@@ -0,0 +1,201 @@
+"""Incremental assembly and validation of HTML documents streamed from an LLM."""
+import time
+from html.parser import HTMLParser
+
+# ---- CONFIGURATION ----
+
+# Rough conversion used for live progress; the API reports exact usage only at the end
+APPROX_CHARS_PER_TOKEN = 4
+
+# A typical infographic document, used to estimate how far along a stream is
+TYPICAL_OUTPUT_TOKENS = 6000
+
+DOCUMENT_END = '</html>'
+
+# Elements that never have a closing tag
+VOID_ELEMENTS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+    'param', 'source', 'track', 'wbr'
+))
+
+# Elements whose closing tag HTML allows to be omitted, so leaving them open is not a defect
+OPTIONAL_END_ELEMENTS = frozenset((
+    'html', 'head', 'body', 'p', 'li', 'dt', 'dd', 'option', 'optgroup', 'tr', 'td', 'th',
+    'thead', 'tbody', 'tfoot', 'colgroup', 'caption', 'rb', 'rt', 'rp'
+))
+
+# ---- VALIDATION ----
+
+class HtmlValidator(HTMLParser):
+    """Track the open elements of a streamed document to tell a finished document from a cut-off one.
+
+    The parser is incremental, so fragments are checked as they arrive
+    instead of re-parsing the whole document at the end. Script and style
+    contents are treated as raw text, and a closing tag implicitly closes any
+    elements left open inside it, the way browsers recover.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.open_elements = []
+        self.document_closed = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in VOID_ELEMENTS:
+            self.open_elements.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # Self-closing syntax (e.g. SVG's <path/>) opens nothing
+        pass
+
+    def handle_endtag(self, tag):
+        if tag in self.open_elements:
+            index = len(self.open_elements) - 1 - self.open_elements[::-1].index(tag)
+            del self.open_elements[index:]
+        if tag == 'html':
+            self.document_closed = True
+
+    @property
+    def pending(self):
+        """Trailing text the parser could not finish yet, e.g. a tag cut off mid-attribute."""
+        # Script/style contents stay buffered until their end tag; that is content, not broken markup
+        if self.cdata_elem:
+            return ''
+        return self.rawdata
+
+    @property
+    def unclosed_tags(self):
+        """Open elements, outermost first, whose closing tag may not be omitted."""
+        return [tag for tag in self.open_elements if tag not in OPTIONAL_END_ELEMENTS]
+
+    @property
+    def truncated(self):
+        """True when the document stops before its end: no `</html>` or an unfinished construct."""
+        return not self.document_closed or bool(self.pending.strip())
+
+    def problems(self):
+        """Human-readable list of the defects found so far."""
+        found = []
+        if self.pending.strip():
+            found.append(f"unfinished markup at the end: {self.pending.strip()[:40]!r}")
+        if self.unclosed_tags:
+            found.append("unclosed tags: " + ", ".join(f"<{tag}>" for tag in self.unclosed_tags))
+        if not self.document_closed:
+            found.append("missing </html>")
+        return found
+
+    def closing_markup(self):
+        """Closing tags for every open element, innermost first, ending with `</html>`."""
+        tags = [tag for tag in reversed(self.open_elements) if tag != 'html']
+        return ''.join(f'</{tag}>' for tag in tags) + DOCUMENT_END
+
+# ---- STREAM ASSEMBLY ----
+
+class HtmlStreamAssembler:
+    """Clean a streamed HTML document as fragments arrive.
+
+    Anything before `<!DOCTYPE html>` / `<html` (markdown fences, stray prose)
+    is dropped, a missing DOCTYPE is added, and the stream is marked complete
+    as soon as the closing `</html>` tag is seen so callers can stop early.
+    The kept text is also fed to an `HtmlValidator`, so a document cut off
+    before its end can be continued or closed without re-parsing it.
+    """
+
+    def __init__(self):
+        self._preamble = ''
+        self._parts = []
+        self._tail = ''
+        self.started = False
+        self.complete = False
+        self.validator = HtmlValidator()
+
+    def feed(self, text):
+        """Add a fragment; return True once the document is complete."""
+        if self.complete or not text:
+            return self.complete
+
+        if not self.started:
+            self._preamble += text
+            start = self._find_document_start(self._preamble)
+            if start is None:
+                return False
+            text = self._preamble[start:]
+            self._preamble = ''
+            self.started = True
+            if not text[:9].lower() == '<!doctype':
+                self._append('<!DOCTYPE html>\n')
+
+        # Look for the end tag across the fragment boundary without rescanning the document
+        window = self._tail + text
+        end = window.lower().find(DOCUMENT_END)
+        if end != -1:
+            keep = end + len(DOCUMENT_END) - len(self._tail)
+            self._append(text[:keep])
+            self.complete = True
+        else:
+            self._append(text)
+            self._tail = window[-(len(DOCUMENT_END) - 1):]
+        return self.complete
+
+    def _append(self, text):
+        self._parts.append(text)
+        self.validator.feed(text)
+
+    def close_document(self):
+        """Repair a document that was cut off: drop an unfinished trailing tag and close every open element.
+
+        Returns the repaired HTML; the assembler is complete afterwards.
+        """
+        if not self.started:
+            return self.html
+        pending = self.validator.pending
+        html = ''.join(self._parts)
+        if pending:
+            html = html[:len(html) - len(pending)]
+        self._parts = [html, self.validator.closing_markup()]
+        self.complete = True
+        return self.html
+
+    @staticmethod
+    def _find_document_start(buffer):
+        lowered = buffer.lower()
+        positions = [p for p in (lowered.find('<!doctype'), lowered.find('<html')) if p != -1]
+        return min(positions) if positions else None
+
+    @property
+    def html(self):
+        """The document assembled so far."""
+        if self.started:
+            return ''.join(self._parts).strip()
+        # No document start seen: fall back to stripping markdown fences
+        return self._preamble.replace('```html', '').replace('```', '').strip()
+
+
+class StreamProgress:
+    """Live progress estimate for a streamed generation."""
+
+    def __init__(self, expected_tokens=TYPICAL_OUTPUT_TOKENS):
+        self.expected_tokens = expected_tokens
+        self.chars = 0
+        self.started_at = time.monotonic()
+
+    def update(self, text):
+        self.chars += len(text)
+
+    @property
+    def tokens(self):
+        return self.chars // APPROX_CHARS_PER_TOKEN
+
+    @property
+    def fraction(self):
+        """Estimated completion in [0, 1); only a finished stream reports 1."""
+        return min(self.tokens / self.expected_tokens, 0.99)
+
+    @property
+    def eta_seconds(self):
+        """Estimated seconds remaining at the current token rate, or None before any tokens."""
+        elapsed = time.monotonic() - self.started_at
+        if not self.tokens or not elapsed:
+            return None
+        rate = self.tokens / elapsed
+        return max(self.expected_tokens - self.tokens, 0) / rate
@@ -0,0 +1,88 @@
+"""httpx transport that puts the shared rate limiting and retries under the OpenAI and Anthropic SDKs.
+
+Working at the transport level covers every SDK call, streamed or not: a
+request is only retried before any of its response has been handed back.
+"""
+import threading
+import time
+
+import httpx
+
+from linkedin_generator.rate_limit import API_MAX_RETRIES, api_slots, backoff_delay, get_limiter, parse_reset_seconds
+
+# ---- CONFIGURATION ----
+
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504, 529}
+
+# 529 is Anthropic's "overloaded"
+THROTTLED_STATUS_CODES = {429, 529}
+
+# ---- TRANSPORT ----
+
+class _SlotReleasingStream(httpx.SyncByteStream):
+    """Response body that gives back the global API slot when it is closed."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self._released = False
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        yield from self._stream
+
+    def close(self):
+        try:
+            self._stream.close()
+        finally:
+            with self._lock:
+                if not self._released:
+                    self._released = True
+                    api_slots.release()
+
+
+class RateLimitedTransport(httpx.HTTPTransport):
+    """HTTP transport with a per-provider adaptive limiter, global slots and jittered retries.
+
+    Build the SDK client with `max_retries=0` so this is the only retry layer.
+    """
+
+    def __init__(self, provider, **kwargs):
+        super().__init__(**kwargs)
+        self.limiter = get_limiter(provider)
+
+    def handle_request(self, request):
+        for attempt in range(API_MAX_RETRIES + 1):
+            self.limiter.acquire()
+            api_slots.acquire()
+            try:
+                response = super().handle_request(request)
+            except (httpx.TimeoutException, httpx.NetworkError):
+                api_slots.release()
+                if attempt == API_MAX_RETRIES:
+                    raise
+                self.limiter.record_retry()
+                time.sleep(backoff_delay(attempt))
+                continue
+            except BaseException:
+                api_slots.release()
+                raise
+
+            self.limiter.observe_headers(response.headers)
+            status = response.status_code
+            throttled = status in THROTTLED_STATUS_CODES
+            if status not in RETRYABLE_STATUS_CODES or attempt == API_MAX_RETRIES:
+                if throttled:
+                    self.limiter.record_throttled()
+                elif status < 400:
+                    self.limiter.record_success()
+                # The slot stays taken until the body (possibly a long stream) is closed
+                response.stream = _SlotReleasingStream(response.stream)
+                return response
+
+            retry_after = parse_reset_seconds(response.headers.get('retry-after'))
+            if throttled:
+                self.limiter.record_throttled(retry_after)
+            self.limiter.record_retry()
+            response.close()
+            api_slots.release()
+            time.sleep(backoff_delay(attempt, retry_after))
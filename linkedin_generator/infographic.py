@@ -0,0 +1,223 @@
+"""Infographics rendered locally from a compact JSON spec instead of hand-written HTML.
+
+Claude only picks the content (title, hook statistic, workflow steps,
+metrics, an optional code snippet and color scheme A or B) through a forced
+tool call, which takes a few hundred output tokens. A Jinja2 template,
+compiled once per process, turns the spec into the same 1200x1200 canvas
+the HTML mode produces, so identical specs always give identical documents.
+The spec is also embedded in the document, so it can be drawn again without
+a browser (see infographic_svg.py).
+"""
+import json
+import os
+import re
+
+# ---- CONFIGURATION ----
+
+INFOGRAPHIC_TEMPLATE_PATH = os.getenv(
+    "INFOGRAPHIC_TEMPLATE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "infographic.html.j2")
+)
+
+SPEC_TOOL_NAME = "render_infographic"
+
+# Limits that keep any spec inside the fixed 1200x1200 layout
+MAX_STEPS = 6
+MAX_STEP_DETAILS = 3
+MAX_METRICS = 4
+MAX_CODE_LINES = 12
+
+COLOR_SCHEMES = ('A', 'B')
+
+SPEC_SCRIPT_ID = "infographic-spec"
+_EMBEDDED_SPEC = re.compile(
+    r'<script type="application/json" id="%s">(.*?)</script>' % SPEC_SCRIPT_ID, re.DOTALL
+)
+
+SPEC_INSTRUCTIONS = """
+You design single-frame technical infographics (1200x1200px, LinkedIn) that explain a talk's workflow.
+Do not write HTML or CSS: the layout is rendered from your answer. Call the render_infographic tool once with:
+- title: the main title, at most 60 characters, e.g. "Traditional RAG vs Graph RAG" or "MUVERA Explained"
+- subtitle: one sentence on what the method or system does
+- hook_stat: the single most striking number from the talk (cost reduction, speed-up, accuracy) and a short label
+- steps: 3-6 workflow steps in order (input -> processing -> output); each has a 2-5 word title, a one-sentence
+  description and up to 3 short technical details (components, parameters, formulas)
+- metrics: up to 4 performance numbers with short labels; only numbers the video content supports
+- code: optional; a short, realistic snippet (at most 12 lines) when the talk is about code, a reward function,
+  an API or a config, with its language
+- key_insight: one sentence with the main takeaway
+- scheme: "A" (clean, light teal and purple, for professional and business topics) or
+  "B" (dark navy with cyan, for AI/ML engineering topics)
+Keep every text short enough to be readable at 300x300px on mobile.
+"""
+
+SPEC_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": "string"},
+        "subtitle": {"type": "string"},
+        "hook_stat": {
+            "type": "object",
+            "properties": {"value": {"type": "string"}, "label": {"type": "string"}},
+            "required": ["value", "label"]
+        },
+        "steps": {
+            "type": "array",
+            "minItems": 3,
+            "maxItems": MAX_STEPS,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "title": {"type": "string"},
+                    "description": {"type": "string"},
+                    "details": {"type": "array", "items": {"type": "string"}, "maxItems": MAX_STEP_DETAILS}
+                },
+                "required": ["title", "description"]
+            }
+        },
+        "metrics": {
+            "type": "array",
+            "maxItems": MAX_METRICS,
+            "items": {
+                "type": "object",
+                "properties": {"value": {"type": "string"}, "label": {"type": "string"}},
+                "required": ["value", "label"]
+            }
+        },
+        "code": {
+            "type": "object",
+            "properties": {"language": {"type": "string"}, "snippet": {"type": "string"}},
+            "required": ["snippet"]
+        },
+        "key_insight": {"type": "string"},
+        "scheme": {"type": "string", "enum": list(COLOR_SCHEMES)}
+    },
+    "required": ["title", "subtitle", "steps", "key_insight", "scheme"]
+}
+
+# ---- SPEC REQUEST ----
+
+def build_spec_prompt(video_content):
+    """The video-specific part of the spec request, sent after SPEC_INSTRUCTIONS."""
+    return f"""Use the video information below to fill the infographic spec.
+Video Title: {video_content['title']}
+Channel: {video_content['channel']}
+Content: {video_content['full_text']}
+"""
+
+
+def build_spec_request(video_content):
+    """Claude request arguments forcing a single render_infographic tool call.
+
+    The instructions carry a prompt-cache breakpoint, so they are shared by
+    every video.
+    """
+    return {
+        'system': [
+            {"type": "text", "text": SPEC_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}}
+        ],
+        'messages': [{"role": "user", "content": build_spec_prompt(video_content)}],
+        'tools': [{
+            "name": SPEC_TOOL_NAME,
+            "description": "Render the infographic from its content.",
+            "input_schema": SPEC_SCHEMA
+        }],
+        'tool_choice': {"type": "tool", "name": SPEC_TOOL_NAME},
+    }
+
+
+def parse_spec(message):
+    """Extract and normalize the spec from Claude's tool call; raises ValueError when there is none."""
+    for block in message.content:
+        if getattr(block, 'type', None) == 'tool_use' and block.name == SPEC_TOOL_NAME:
+            return normalize_spec(block.input)
+    raise ValueError(f"Claude did not call {SPEC_TOOL_NAME} (stop reason: {getattr(message, 'stop_reason', None)})")
+
+
+def _text(value):
+    return str(value).strip() if value is not None else ''
+
+
+def normalize_spec(spec):
+    """Coerce a spec into the shape the template expects, trimming lists to what fits the canvas."""
+    if not isinstance(spec, dict):
+        raise ValueError("Infographic spec must be a JSON object")
+    steps = [
+        {
+            'title': _text(step.get('title')),
+            'description': _text(step.get('description')),
+            'details': [_text(detail) for detail in step.get('details') or [] if _text(detail)][:MAX_STEP_DETAILS],
+        }
+        for step in spec.get('steps') or [] if isinstance(step, dict) and _text(step.get('title'))
+    ][:MAX_STEPS]
+    if not _text(spec.get('title')) or not steps:
+        raise ValueError("Infographic spec needs a title and at least one step")
+
+    hook_stat = spec.get('hook_stat') if isinstance(spec.get('hook_stat'), dict) else {}
+    code = spec.get('code') if isinstance(spec.get('code'), dict) else {}
+    snippet = '\n'.join(_text(code.get('snippet')).splitlines()[:MAX_CODE_LINES])
+    scheme = _text(spec.get('scheme')).upper()
+    return {
+        'title': _text(spec['title']),
+        'subtitle': _text(spec.get('subtitle')),
+        'hook_stat': {'value': _text(hook_stat.get('value')), 'label': _text(hook_stat.get('label'))},
+        'steps': steps,
+        'metrics': [
+            {'value': _text(metric.get('value')), 'label': _text(metric.get('label'))}
+            for metric in spec.get('metrics') or [] if isinstance(metric, dict) and _text(metric.get('value'))
+        ][:MAX_METRICS],
+        'code': {'language': _text(code.get('language')), 'snippet': snippet} if snippet else None,
+        'key_insight': _text(spec.get('key_insight')),
+        'scheme': scheme if scheme in COLOR_SCHEMES else COLOR_SCHEMES[0],
+    }
+
+# ---- RENDERING ----
+
+_template = None
+
+
+def get_infographic_template():
+    """Compile the Jinja2 template on first use and keep it for the life of the process."""
+    global _template
+    if _template is None:
+        # Imported here so the HTML mode and the CLIs don't pay for Jinja2 at startup
+        from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+        environment = Environment(
+            loader=FileSystemLoader(os.path.dirname(INFOGRAPHIC_TEMPLATE_PATH)),
+            autoescape=True,
+            undefined=StrictUndefined,
+            trim_blocks=True,
+            lstrip_blocks=True,
+            auto_reload=False
+        )
+        _template = environment.get_template(os.path.basename(INFOGRAPHIC_TEMPLATE_PATH))
+    return _template
+
+
+def render_infographic(spec, video_content):
+    """Render a normalized spec into a complete, self-contained HTML document."""
+    embedded = {'spec': spec, 'channel': video_content['channel'], 'video_title': video_content['title']}
+    return get_infographic_template().render(
+        spec=spec,
+        channel=video_content['channel'],
+        video_title=video_content['title'],
+        embedded=embedded,
+        spec_script_id=SPEC_SCRIPT_ID
+    ).strip()
+
+
+def embedded_spec(html):
+    """Return the `{'spec', 'channel', 'video_title'}` embedded by `render_infographic`, or None.
+
+    Documents written by Claude in HTML mode carry no spec.
+    """
+    match = _EMBEDDED_SPEC.search(html)
+    if match is None:
+        return None
+    embedded = json.loads(match.group(1))
+    return {
+        'spec': normalize_spec(embedded['spec']),
+        'channel': embedded.get('channel', ''),
+        'video_title': embedded.get('video_title', ''),
+    }
@@ -0,0 +1,126 @@
+"""Durable per-video job state for batch runs, so an interrupted run resumes where it stopped."""
+import os
+import sqlite3
+import time
+
+# ---- CONFIGURATION ----
+
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", os.path.join(".cache", "jobs.sqlite3"))
+
+# ---- QUEUE ----
+
+class JobQueue:
+    """SQLite-backed queue of videos and the output of every stage run for them.
+
+    Each stage's output is committed as soon as it finishes. A rerun (after a
+    failure or a crash) looks the saved outputs up and only runs the stages
+    that are missing, so completed LLM calls are never paid for twice.
+    """
+
+    def __init__(self, path=JOB_QUEUE_PATH):
+        self.path = path
+        self._initialized = False
+
+    def _connect(self):
+        """Open a connection; one per call keeps the queue safe across worker threads."""
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    video_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    updated_at REAL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stages (
+                    video_id TEXT NOT NULL,
+                    stage TEXT NOT NULL,
+                    output BLOB,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL,
+                    PRIMARY KEY (video_id, stage)
+                )
+            """)
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _execute(self, sql, rows):
+        conn = self._connect()
+        try:
+            conn.executemany(sql, rows)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def enqueue(self, video_ids):
+        """Queue videos; finished ones stay finished, anything else is set back to pending."""
+        now = time.time()
+        self._execute(
+            "INSERT INTO jobs (video_id, status, updated_at) VALUES (?, 'pending', ?) "
+            "ON CONFLICT(video_id) DO UPDATE SET status = 'pending', updated_at = excluded.updated_at "
+            "WHERE jobs.status != 'done'",
+            [(video_id, now) for video_id in video_ids]
+        )
+
+    def reset(self, video_ids):
+        """Forget every saved stage output so the videos are generated from scratch."""
+        self._execute("DELETE FROM stages WHERE video_id = ?", [(video_id,) for video_id in video_ids])
+        self._execute(
+            "UPDATE jobs SET status = 'pending', error = NULL, updated_at = ? WHERE video_id = ?",
+            [(time.time(), video_id) for video_id in video_ids]
+        )
+
+    def start(self, video_id):
+        """Mark a video as running; a crash leaves it running until the next enqueue."""
+        self._execute(
+            "UPDATE jobs SET status = 'running', attempts = attempts + 1, updated_at = ? WHERE video_id = ?",
+            [(time.time(), video_id)]
+        )
+
+    def finish(self, video_id, error=None):
+        """Mark a video done, or failed with the stage errors that stopped it."""
+        self._execute(
+            "UPDATE jobs SET status = ?, error = ?, updated_at = ? WHERE video_id = ?",
+            [('failed' if error else 'done', error, time.time(), video_id)]
+        )
+
+    def get_outputs(self, video_id):
+        """Return `{stage: output}` for the stages that have completed."""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT stage, output FROM stages WHERE video_id = ? AND output IS NOT NULL",
+                (video_id,)
+            ).fetchall()
+        finally:
+            conn.close()
+        return dict(rows)
+
+    def save_output(self, video_id, stage, output):
+        """Commit a finished stage; text is stored as TEXT and bytes as BLOB."""
+        self._execute(
+            "INSERT INTO stages (video_id, stage, output, attempts, updated_at) VALUES (?, ?, ?, 1, ?) "
+            "ON CONFLICT(video_id, stage) DO UPDATE SET output = excluded.output, error = NULL, "
+            "attempts = stages.attempts + 1, updated_at = excluded.updated_at",
+            [(video_id, stage, output, time.time())]
+        )
+
+    def save_error(self, video_id, stage, error):
+        """Record a failed stage; it is retried the next time the video is processed."""
+        self._execute(
+            "INSERT INTO stages (video_id, stage, error, attempts, updated_at) VALUES (?, ?, ?, 1, ?) "
+            "ON CONFLICT(video_id, stage) DO UPDATE SET error = excluded.error, "
+            "attempts = stages.attempts + 1, updated_at = excluded.updated_at",
+            [(video_id, stage, error, time.time())]
+        )
+
@@ -0,0 +1,178 @@
+"""Shared GPT call path with a bounded, in-process response cache."""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from linkedin_generator.metrics import record_cache_hit, record_usage
+
+# ---- CONFIGURATION ----
+
+DEFAULT_MODEL = "gpt-4o"
+DEFAULT_TEMPERATURE = 0.7
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+RESPONSE_CACHE_MAX_CHARS = int(os.getenv("RESPONSE_CACHE_MAX_CHARS", str(4_000_000)))
+
+# ---- RESPONSE CACHE ----
+
+class ResponseCache:
+    """Thread-safe LRU cache of completions, bounded by entry count and total size."""
+
+    def __init__(self, max_entries=RESPONSE_CACHE_MAX_ENTRIES, max_chars=RESPONSE_CACHE_MAX_CHARS):
+        self.max_entries = max_entries
+        self.max_chars = max_chars
+        self._entries = OrderedDict()
+        self._chars = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model, temperature, prompt, response_format=None, system=None):
+        """Hash the inputs that fully determine a completion request."""
+        request = [model, temperature, prompt]
+        if response_format is not None:
+            request.append(response_format)
+        if system is not None:
+            request.append({'system': system})
+        payload = json.dumps(request, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def set(self, key, value):
+        with self._lock:
+            if key in self._entries:
+                self._chars -= len(self._entries.pop(key))
+            # Never let a single oversized value flush the whole cache
+            if len(value) > self.max_chars:
+                return
+            self._entries[key] = value
+            self._chars += len(value)
+            while len(self._entries) > self.max_entries or self._chars > self.max_chars:
+                _, evicted = self._entries.popitem(last=False)
+                self._chars -= len(evicted)
+                self.evictions += 1
+
+    def record_bypass(self):
+        with self._lock:
+            self.bypasses += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._chars = 0
+
+    def stats(self):
+        """Return counters suitable for display or logging."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'chars': self._chars,
+                'hits': self.hits,
+                'misses': self.misses,
+                'bypasses': self.bypasses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+# One cache per process, shared by every Streamlit session
+response_cache = ResponseCache()
+
+# ---- COMPLETION CALLS ----
+
+def chat_completion(client, prompt, model=DEFAULT_MODEL, temperature=DEFAULT_TEMPERATURE, fresh=False,
+                    on_delta=None, response_format=None, system=None):
+    """Return the completion text for a prompt, using the cache.
+
+    With `fresh=True` the cache is skipped for the lookup (to get a new
+    variation) but the new response still replaces the cached one. When
+    `on_delta` is given the response is streamed and each text fragment is
+    passed to it as it arrives; a cache hit is delivered as one fragment.
+    `response_format` is forwarded for structured output and is part of the
+    cache key. `system` is sent as a system message before the prompt; keep
+    it identical across calls that share it so OpenAI's automatic prompt
+    caching can reuse it.
+    """
+    key = response_cache.make_key(model, temperature, prompt, response_format, system)
+    messages = build_messages(prompt, system)
+    if fresh:
+        response_cache.record_bypass()
+    else:
+        cached = response_cache.get(key)
+        if cached is not None:
+            record_cache_hit()
+            if on_delta:
+                on_delta(cached)
+            return cached
+
+    if on_delta:
+        content = _stream_completion(client, messages, model, temperature, on_delta)
+    else:
+        request = {}
+        if response_format is not None:
+            request['response_format'] = response_format
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            **request
+        )
+        content = response.choices[0].message.content
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            record_usage(model, usage.prompt_tokens, usage.completion_tokens, cached_prompt_tokens(usage))
+    if content:
+        response_cache.set(key, content)
+    return content
+
+
+def build_messages(prompt, system=None):
+    """Chat messages with the shared system prefix (if any) first, so identical prefixes stay cacheable."""
+    messages = [{"role": "user", "content": prompt}]
+    if system is not None:
+        messages.insert(0, {"role": "system", "content": system})
+    return messages
+
+
+def cached_prompt_tokens(usage):
+    """Prompt tokens OpenAI served from its prompt cache (0 when not reported)."""
+    details = getattr(usage, 'prompt_tokens_details', None)
+    return getattr(details, 'cached_tokens', 0) or 0
+
+
+def _stream_completion(client, messages, model, temperature, on_delta):
+    """Stream a completion, forwarding each text fragment and returning the full text."""
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        stream=True,
+        stream_options={"include_usage": True}
+    )
+    parts = []
+    for chunk in stream:
+        # With include_usage the last chunk has no choices and carries the token counts
+        usage = getattr(chunk, 'usage', None)
+        if usage is not None:
+            record_usage(model, usage.prompt_tokens, usage.completion_tokens, cached_prompt_tokens(usage))
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            on_delta(delta)
+    return ''.join(parts)
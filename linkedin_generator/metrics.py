@@ -0,0 +1,287 @@
+"""Per-stage timing and token usage, exported as Prometheus metrics and OpenTelemetry spans.
+
+Wrap a pipeline stage in `stage_span(name)`; LLM calls made inside it report
+their usage with `record_usage`, including how many prompt tokens the
+provider served from its prompt cache, and `record_stop_reason` why the
+response ended (a `max_tokens` stop means the output was truncated). Every
+span is
+
+- added to the process-wide Prometheus histograms and counters
+  (`render_prometheus()`, served at `/metrics` by service.py),
+- emitted as an OpenTelemetry span when `opentelemetry-api` is installed
+  (a no-op unless the process configures an SDK exporter), and
+- appended to the current `collect_stages()` run, which the Streamlit apps
+  show in their performance panel.
+
+Worker threads do not inherit context variables, so submit work with
+`contextvars.copy_context().run` to keep spans attached to the caller's run.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# ---- CONFIGURATION ----
+
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+METRIC_PREFIX = "linkedin_generator"
+
+# ---- SPANS ----
+
+class StageSpan:
+    """Timing and usage of one stage execution."""
+
+    def __init__(self, stage):
+        self.stage = stage
+        self.status = 'ok'
+        self.error = None
+        self.seconds = 0.0
+        self.model = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_prompt_tokens = 0
+        self.stop_reason = None
+        self.repairs = []
+        self.cached = False
+
+    def fail(self, error):
+        """Mark the stage failed without raising, for stages that return error text."""
+        self.status = 'error'
+        self.error = str(error)
+
+    def to_dict(self):
+        return {
+            'stage': self.stage,
+            'status': self.status,
+            'seconds': round(self.seconds, 3),
+            'model': self.model,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'cached_prompt_tokens': self.cached_prompt_tokens,
+            'stop_reason': self.stop_reason,
+            'repairs': list(self.repairs),
+            'cached': self.cached,
+        }
+
+
+_current_span = contextvars.ContextVar('linkedin_generator_span', default=None)
+_current_run = contextvars.ContextVar('linkedin_generator_run', default=None)
+
+_tracer = None
+_tracer_loaded = False
+
+
+def _get_tracer():
+    """Return an OpenTelemetry tracer, or None when the API is not installed."""
+    global _tracer, _tracer_loaded
+    if not _tracer_loaded:
+        try:
+            from opentelemetry import trace
+            _tracer = trace.get_tracer("linkedin_generator")
+        except ImportError:
+            _tracer = None
+        _tracer_loaded = True
+    return _tracer
+
+
+@contextmanager
+def stage_span(stage):
+    """Time a pipeline stage; exceptions mark it failed and propagate."""
+    span = StageSpan(stage)
+    token = _current_span.set(span)
+    tracer = _get_tracer()
+    otel_context = tracer.start_as_current_span(f"linkedin_generator.{stage}") if tracer else None
+    otel_span = otel_context.__enter__() if otel_context else None
+    started = time.perf_counter()
+    try:
+        yield span
+    except Exception as e:
+        span.fail(e)
+        raise
+    finally:
+        span.seconds = time.perf_counter() - started
+        _current_span.reset(token)
+        registry.observe(span)
+        run = _current_run.get()
+        if run is not None:
+            run.append(span.to_dict())
+        if otel_context:
+            otel_span.set_attribute("stage", stage)
+            otel_span.set_attribute("status", span.status)
+            otel_span.set_attribute("llm.cached", span.cached)
+            if span.model:
+                otel_span.set_attribute("llm.model", span.model)
+                otel_span.set_attribute("llm.usage.prompt_tokens", span.prompt_tokens)
+                otel_span.set_attribute("llm.usage.completion_tokens", span.completion_tokens)
+                otel_span.set_attribute("llm.usage.cached_prompt_tokens", span.cached_prompt_tokens)
+            if span.stop_reason:
+                otel_span.set_attribute("llm.stop_reason", span.stop_reason)
+            if span.repairs:
+                otel_span.set_attribute("html.repairs", ",".join(span.repairs))
+            if span.error:
+                otel_span.set_attribute("error.message", span.error)
+            otel_context.__exit__(None, None, None)
+
+
+def record_usage(model, prompt_tokens, completion_tokens, cached_prompt_tokens=0):
+    """Attach an LLM response's token usage to the enclosing stage span.
+
+    `prompt_tokens` counts every input token; `cached_prompt_tokens` is the
+    part of it read from the provider's prompt cache.
+    """
+    span = _current_span.get()
+    if span is None:
+        registry.add_tokens('unspanned', model, prompt_tokens or 0, completion_tokens or 0, cached_prompt_tokens or 0)
+        return
+    span.model = model
+    span.prompt_tokens += prompt_tokens or 0
+    span.completion_tokens += completion_tokens or 0
+    span.cached_prompt_tokens += cached_prompt_tokens or 0
+
+
+def record_stop_reason(model, reason):
+    """Count why an LLM response ended; the enclosing span keeps the last reason.
+
+    Responses left early (e.g. once `</html>` arrived) have no reason and
+    are counted as "stopped_early".
+    """
+    reason = reason or 'stopped_early'
+    span = _current_span.get()
+    if span is not None:
+        span.stop_reason = reason
+    registry.add_stop_reason(span.stage if span is not None else 'unspanned', model, reason)
+
+
+def record_repair(kind):
+    """Count a repair of truncated output (e.g. "continuation" or "closed_tags") in the enclosing stage."""
+    span = _current_span.get()
+    if span is not None:
+        span.repairs.append(kind)
+    registry.add_repair(span.stage if span is not None else 'unspanned', kind)
+
+
+def cached_prompt_ratio(spans):
+    """Share of prompt tokens served from provider prompt caches across span dicts, or None without usage."""
+    prompt_tokens = sum(span['prompt_tokens'] for span in spans)
+    if not prompt_tokens:
+        return None
+    return sum(span['cached_prompt_tokens'] for span in spans) / prompt_tokens
+
+
+def record_cache_hit():
+    """Mark the enclosing stage as served from the response cache."""
+    span = _current_span.get()
+    if span is not None:
+        span.cached = True
+
+
+@contextmanager
+def collect_stages():
+    """Collect the spans of everything run inside the block (including copied contexts)."""
+    run = []
+    token = _current_run.set(run)
+    try:
+        yield run
+    finally:
+        _current_run.reset(token)
+
+# ---- PROMETHEUS EXPORT ----
+
+class MetricsRegistry:
+    """Process-wide stage histograms and token counters in Prometheus text format."""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._durations = {}
+        self._tokens = {}
+        self._stop_reasons = {}
+        self._repairs = {}
+
+    def observe(self, span):
+        with self._lock:
+            key = (span.stage, span.status)
+            histogram = self._durations.get(key)
+            if histogram is None:
+                histogram = self._durations[key] = {'buckets': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+            for i, bound in enumerate(self.buckets):
+                if span.seconds <= bound:
+                    histogram['buckets'][i] += 1
+            histogram['sum'] += span.seconds
+            histogram['count'] += 1
+        if span.model:
+            self.add_tokens(span.stage, span.model, span.prompt_tokens, span.completion_tokens,
+                            span.cached_prompt_tokens)
+
+    def add_tokens(self, stage, model, prompt_tokens, completion_tokens, cached_prompt_tokens=0):
+        with self._lock:
+            for kind, count in (('prompt', prompt_tokens), ('completion', completion_tokens),
+                                ('cached_prompt', cached_prompt_tokens)):
+                key = (stage, model, kind)
+                self._tokens[key] = self._tokens.get(key, 0) + count
+
+    def add_stop_reason(self, stage, model, reason):
+        with self._lock:
+            key = (stage, model, reason)
+            self._stop_reasons[key] = self._stop_reasons.get(key, 0) + 1
+
+    def add_repair(self, stage, kind):
+        with self._lock:
+            self._repairs[(stage, kind)] = self._repairs.get((stage, kind), 0) + 1
+
+    def reset(self):
+        with self._lock:
+            self._durations.clear()
+            self._tokens.clear()
+            self._stop_reasons.clear()
+            self._repairs.clear()
+
+    def render(self):
+        """Return the metrics in the Prometheus text exposition format."""
+        name = f"{METRIC_PREFIX}_stage_duration_seconds"
+        lines = [f"# HELP {name} Wall-clock time of each pipeline stage.", f"# TYPE {name} histogram"]
+        with self._lock:
+            for (stage, status), histogram in sorted(self._durations.items()):
+                labels = f'stage="{stage}",status="{status}"'
+                for bound, count in zip(self.buckets, histogram['buckets']):
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {count}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram["count"]}')
+                lines.append(f'{name}_sum{{{labels}}} {histogram["sum"]:.6f}')
+                lines.append(f'{name}_count{{{labels}}} {histogram["count"]}')
+
+            name = f"{METRIC_PREFIX}_llm_tokens_total"
+            lines += [f"# HELP {name} Tokens reported in LLM response usage; type=\"cached_prompt\" is the "
+                      f"part of the prompt tokens served from the provider's prompt cache.",
+                      f"# TYPE {name} counter"]
+            for (stage, model, kind), count in sorted(self._tokens.items()):
+                lines.append(f'{name}{{stage="{stage}",model="{model}",type="{kind}"}} {count}')
+
+            name = f"{METRIC_PREFIX}_llm_cached_prompt_ratio"
+            lines += [f"# HELP {name} Share of prompt tokens served from the provider's prompt cache.",
+                      f"# TYPE {name} gauge"]
+            for (stage, model, kind), count in sorted(self._tokens.items()):
+                if kind == 'prompt' and count:
+                    cached = self._tokens.get((stage, model, 'cached_prompt'), 0)
+                    lines.append(f'{name}{{stage="{stage}",model="{model}"}} {cached / count:.4f}')
+
+            name = f"{METRIC_PREFIX}_llm_stop_reasons_total"
+            lines += [f"# HELP {name} LLM responses by the reason they ended; reason=\"max_tokens\" means "
+                      f"the output was truncated.",
+                      f"# TYPE {name} counter"]
+            for (stage, model, reason), count in sorted(self._stop_reasons.items()):
+                lines.append(f'{name}{{stage="{stage}",model="{model}",reason="{reason}"}} {count}')
+
+            name = f"{METRIC_PREFIX}_output_repairs_total"
+            lines += [f"# HELP {name} Repairs of truncated output: continuation requests and locally closed tags.",
+                      f"# TYPE {name} counter"]
+            for (stage, kind), count in sorted(self._repairs.items()):
+                lines.append(f'{name}{{stage="{stage}",kind="{kind}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def render_prometheus():
+    return registry.render()
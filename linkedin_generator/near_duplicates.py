@@ -0,0 +1,188 @@
+"""Near-duplicate detection of re-uploaded talks, so their generated posts can be reused.
+
+The same talk is often uploaded as a full-length, trimmed and clip version
+under different video IDs with nearly the same title and description. Each
+video's `full_text` is reduced to a MinHash signature over word 3-shingles,
+whose agreement estimates the Jaccard similarity of the two texts. Signatures
+are split into bands for locality-sensitive hashing, so a lookup only
+compares against videos that share at least one band bucket instead of
+scanning the whole index.
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import time
+
+import numpy as np
+
+# ---- CONFIGURATION ----
+
+DUPLICATE_INDEX_PATH = os.getenv("DUPLICATE_INDEX_PATH", os.path.join(".cache", "duplicates.sqlite3"))
+
+# Estimated Jaccard similarity above which a video counts as a re-upload
+DUPLICATE_MIN_SIMILARITY = float(os.getenv("DUPLICATE_MIN_SIMILARITY", "0.7"))
+
+# 32 bands of 4 rows find pairs above ~0.5 similarity with high probability
+NUM_PERMUTATIONS = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+SHINGLE_WORDS = 3
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _stable_hash(data, size=4):
+    """Process-independent integer hash (Python's `hash` is salted per process)."""
+    return int.from_bytes(hashlib.blake2b(data, digest_size=size).digest(), 'little')
+
+
+# Permutation parameters derived from fixed seeds, so signatures stay comparable across runs
+_A = np.array([_stable_hash(b"a%d" % i) % (_MERSENNE_PRIME - 1) + 1 for i in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+_B = np.array([_stable_hash(b"b%d" % i) % _MERSENNE_PRIME for i in range(NUM_PERMUTATIONS)], dtype=np.uint64)
+
+# ---- SIGNATURES ----
+
+def shingles(text, size=SHINGLE_WORDS):
+    """Distinct lowercase word n-grams of `text`; short texts fall back to single words."""
+    words = _WORD.findall(text.lower())
+    if len(words) < size:
+        return set(words)
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def minhash(text):
+    """MinHash signature of `text` as a uint32 array, or None when it has no words."""
+    tokens = shingles(text)
+    if not tokens:
+        return None
+    hashes = np.fromiter((_stable_hash(token.encode('utf-8')) for token in tokens), dtype=np.uint64, count=len(tokens))
+    # (a * x + b) mod p for every permutation and shingle at once; a < 2^31 and x < 2^32 cannot overflow
+    permuted = (np.outer(_A, hashes) + _B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def similarity(signature, other):
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return float(np.mean(signature == other))
+
+
+def band_keys(signature):
+    """One bucket key per LSH band, as signed 64-bit integers for SQLite."""
+    bands = signature.reshape(BANDS, ROWS_PER_BAND)
+    return [
+        int.from_bytes(hashlib.blake2b(band.tobytes(), digest_size=8).digest(), 'little', signed=True)
+        for band in bands
+    ]
+
+# ---- INDEX ----
+
+class DuplicateIndex:
+    """SQLite store of video signatures, LSH buckets and the outputs generated for each video."""
+
+    def __init__(self, path=DUPLICATE_INDEX_PATH, min_similarity=DUPLICATE_MIN_SIMILARITY):
+        self.path = path
+        self.min_similarity = min_similarity
+        self._initialized = False
+
+    def _connect(self):
+        """Open a connection; one per call keeps the index safe across threads."""
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    video_id TEXT PRIMARY KEY,
+                    title TEXT,
+                    video_url TEXT,
+                    signature BLOB NOT NULL,
+                    outputs TEXT NOT NULL,
+                    updated_at REAL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS bands (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    video_id TEXT NOT NULL,
+                    PRIMARY KEY (band, bucket, video_id)
+                )
+            """)
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def add(self, video_id, video_content, video_url, outputs):
+        """Remember a video's signature and the outputs generated for it."""
+        signature = minhash(video_content['full_text'])
+        if signature is None:
+            return
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM bands WHERE video_id = ?", (video_id,))
+            conn.execute(
+                "INSERT OR REPLACE INTO videos (video_id, title, video_url, signature, outputs, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (video_id, video_content['title'], video_url, signature.tobytes(),
+                 json.dumps(outputs, ensure_ascii=False), time.time())
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO bands (band, bucket, video_id) VALUES (?, ?, ?)",
+                [(band, bucket, video_id) for band, bucket in enumerate(band_keys(signature))]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def find(self, video_content, exclude=None):
+        """Return the most similar indexed video above the threshold, or None.
+
+        The result is a dict with `video_id`, `title`, `video_url`,
+        `similarity` and the stored `outputs`.
+        """
+        signature = minhash(video_content['full_text'])
+        if signature is None:
+            return None
+        conn = self._connect()
+        try:
+            candidates = conn.execute(
+                "SELECT DISTINCT v.video_id, v.title, v.video_url, v.signature, v.outputs "
+                "FROM bands b JOIN videos v ON v.video_id = b.video_id "
+                "WHERE " + " OR ".join(["(b.band = ? AND b.bucket = ?)"] * BANDS),
+                [value for band, bucket in enumerate(band_keys(signature)) for value in (band, bucket)]
+            ).fetchall()
+        finally:
+            conn.close()
+
+        best = None
+        for video_id, title, video_url, stored, outputs in candidates:
+            if video_id == exclude:
+                continue
+            score = similarity(signature, np.frombuffer(stored, dtype=np.uint32))
+            if score >= self.min_similarity and (best is None or score > best['similarity']):
+                best = {'video_id': video_id, 'title': title, 'video_url': video_url,
+                        'similarity': score, 'outputs': outputs}
+        if best is not None:
+            best['outputs'] = json.loads(best['outputs'])
+        return best
+
+
+duplicate_index = DuplicateIndex()
+
+
+def retarget_outputs(outputs, old_url, new_url):
+    """Point reused outputs at the new video's URL instead of the one they were written for."""
+    if not old_url or old_url == new_url:
+        return outputs
+    if isinstance(outputs, dict):
+        return {key: retarget_outputs(value, old_url, new_url) for key, value in outputs.items()}
+    if isinstance(outputs, str):
+        return outputs.replace(old_url, new_url)
+    return outputs
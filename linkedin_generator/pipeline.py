@@ -0,0 +1,746 @@
+"""UI-free content pipeline: YouTube lookup, LinkedIn posts, infographic HTML and PNG.
+
+Shared by the Streamlit apps, the batch CLI and the HTTP service. Nothing here
+touches Streamlit, so problems are raised (or returned as error text, as the
+generators always have) instead of being displayed.
+"""
+import contextvars
+import os
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse, parse_qs
+
+from linkedin_generator.exports import export_images
+from linkedin_generator.html_stream import HtmlStreamAssembler, StreamProgress
+from linkedin_generator.infographic import build_spec_request, parse_spec, render_infographic
+from linkedin_generator.metrics import record_repair, record_stop_reason, record_usage, stage_span
+from linkedin_generator.providers import execute_youtube, get_anthropic_client, get_openai_client, get_youtube_client
+from linkedin_generator.renderer import get_renderer
+from linkedin_generator.templates import POST_TEMPLATES, get_template, run_combined_templates, run_template
+from linkedin_generator.youtube_cache import YouTubeCache
+
+# ---- CONFIGURATION ----
+
+# Upper bound on LLM requests in flight while generating one video's posts
+MAX_CONCURRENT_LLM_CALLS = int(os.getenv("MAX_CONCURRENT_LLM_CALLS", "7"))
+
+WORKFLOW_MODEL = "claude-sonnet-4-20250514"
+WORKFLOW_MAX_TOKENS = int(os.getenv("WORKFLOW_MAX_TOKENS", "8000"))
+
+# Follow-up requests that resume a truncated workflow document before it is closed locally
+WORKFLOW_MAX_CONTINUATIONS = int(os.getenv("WORKFLOW_MAX_CONTINUATIONS", "2"))
+
+# 'html': Claude writes the whole document; 'spec': Claude writes a short JSON spec rendered locally
+WORKFLOW_MODES = ('html', 'spec')
+WORKFLOW_MODE = os.getenv("WORKFLOW_MODE", "html")
+WORKFLOW_SPEC_MAX_TOKENS = int(os.getenv("WORKFLOW_SPEC_MAX_TOKENS", "2000"))
+
+youtube_cache = YouTubeCache()
+
+
+class VideoNotFoundError(LookupError):
+    """The video does not exist or is private."""
+
+# ---- UTILITY FUNCTIONS ----
+
+def get_youtube_id(url):
+    """Extract the video ID from any YouTube URL."""
+    # Parse the URL and get the query parameters
+    query = urlparse(url).query
+    params = parse_qs(query)
+    
+    # 'v' is the video id parameter
+    video_id = params.get('v')
+    if video_id:
+        return video_id[0]
+    
+    # Fallback for youtu.be short links
+    if "youtu.be/" in url:
+        return url.split("youtu.be/")[-1].split("?")[0]
+    
+    raise ValueError("Could not extract video ID from URL!")
+
+# ---- YOUTUBE API FUNCTIONS ----
+
+def build_video_content(video_item):
+    """Turn a videos().list item into the structured content used by the generators"""
+    # Extract data
+    snippet = video_item['snippet']
+    stats = video_item.get('statistics', {})
+    
+    title = snippet['title']
+    description = snippet['description']
+    channel = snippet['channelTitle']
+    published = snippet['publishedAt']
+    view_count = stats.get('viewCount', 'N/A')
+    
+    # Create structured content
+    return {
+        'title': title,
+        'description': description,
+        'channel': channel,
+        'published': published,
+        'view_count': view_count,
+        'full_text': f"Title: {title}\n\nChannel: {channel}\n\nDescription: {description}"
+    }
+
+def fetch_video_content(video_id):
+    """Fetch the structured content for a video ID, or None if it doesn't exist"""
+    def fetch_video(part):
+        # Get video details with the shared client; one HTTPS round trip per call
+        video_response = execute_youtube(get_youtube_client().videos().list(
+            part=part,
+            id=video_id
+        ))
+        return video_response['items'][0] if video_response['items'] else None
+    
+    # Served from the local cache unless the snippet or statistics are stale
+    with stage_span('youtube'):
+        video_item = youtube_cache.get_video(video_id, fetch_video)
+    return build_video_content(video_item) if video_item else None
+
+def get_video_content(youtube_url):
+    """Return (video_id, video_content) for a YouTube URL.
+    
+    Raises ValueError for URLs without a video ID and VideoNotFoundError for
+    missing or private videos; API errors propagate unchanged.
+    """
+    video_id = get_youtube_id(youtube_url)
+    video_content = fetch_video_content(video_id)
+    if not video_content:
+        raise VideoNotFoundError("Video not found or is private")
+    return video_id, video_content
+
+def add_transcript_brief(video_id, video_content, caption_file=None, fresh=False):
+    """Return the video content with a summary of its transcript appended, or unchanged without captions.
+
+    Captions come from `caption_file` (a .vtt/.srt path or binary file) or the
+    video's YouTube caption track. The summary is cached per video, so every
+    generator and every later run shares it.
+    """
+    # Imported here so the caption client only loads when transcripts are used
+    from linkedin_generator.transcripts import get_transcript_brief, with_transcript_brief
+
+    with stage_span('transcript'):
+        brief = get_transcript_brief(video_id, video_content['title'], caption_file, fresh)
+    return with_transcript_brief(video_content, brief)
+
+# ---- TEMPLATE GENERATION FUNCTIONS ----
+
+def generate_post(template_name, video_content, video_url, fresh=False, on_delta=None):
+    """Generate one LinkedIn post from the template registry"""
+    template = POST_TEMPLATES[template_name]
+    with stage_span(f"post:{template.key}"):
+        return run_template(get_openai_client(), template, video_content, video_url, fresh, on_delta)
+
+def generate_pinned_comment(video_content, fresh=False):
+    """Generate strategic pinned comment"""
+    with stage_span('pinned_comment'):
+        return run_template(get_openai_client(), get_template('pinned_comment'), video_content, fresh=fresh)
+
+def suggest_local_hashtags(video_content):
+    """Hashtags from the local keyword index, or None when it is not confident enough"""
+    # Imported here so NumPy only loads once hashtags are needed
+    from linkedin_generator.hashtags import suggest_hashtags
+    
+    return suggest_hashtags(video_content)
+
+def generate_hashtags(video_content, fresh=False, local=True):
+    """Generate relevant hashtags, locally when the keyword index is confident and with GPT-4o otherwise
+    
+    Pass `local=False` when the caller has already found the index not confident.
+    """
+    with stage_span('hashtags'):
+        hashtags = suggest_local_hashtags(video_content) if local else None
+        if hashtags:
+            return hashtags
+        return run_template(get_openai_client(), get_template('hashtags'), video_content, fresh=fresh)
+
+# ---- INFOGRAPHIC FUNCTIONS ----
+
+WORKFLOW_INSTRUCTIONS = """
+You are an expert workflow visualization designer. Create an interactive HTML workflow diagram based on this video content.Create a complete, self-contained HTML workflow diagram. The output must be a COMPLETE HTML document that starts with <!DOCTYPE html> and ends with </html>.Do not wrap in ```html``` or any other formatting.
+# Updated Technical Infographic Design Prompt
+
+Create a single-frame technical infographic in the style of professional software architecture diagrams with modern AI/ML visualization aesthetics.
+
+## CANVAS SPECIFICATIONS:
+- Size: 1200x1200px (square format for LinkedIn)
+- Background: Clean white with subtle gradient overlay OR dark navy/purple gradient (based on content type)
+- Grid system: Invisible 12-column layout for precise alignment
+- Margins: 60px on all sides for breathing room
+
+## VISUAL STYLE REQUIREMENTS:
+- Design aesthetic: Professional software documentation style with modern AI/ML touches
+- Color palette options:
+
+### SCHEME A - Professional Tech (Clean):
+- Primary: #008B8B (Dark Teal)
+- Secondary: #20B2AA (Light Teal/Cyan)
+- Accent: #9370DB (Medium Purple)
+- Background: #FFFFFF to #F0F8FF gradient
+- Text: Dark grays (#1A202C, #4A5568, #718096)
+
+### SCHEME B - Modern AI/ML (Dark):
+- Primary: #06B6D4 (Bright Cyan)
+- Secondary: #3B82F6 (Blue)
+- Accent: #10B981 (Green) or #F59E0B (Orange)
+- Background: #0F172A to #1E293B gradient (dark navy)
+- Text: Light colors (#FFFFFF, #E2E8F0, #94A3B8)
+
+### SCHEME C - Comparison Contrast:
+- Side A: #EF4444 (Red/Orange) for traditional/old methods
+- Side B: #06B6D4 (Cyan/Blue) for new/improved methods
+- Accent: #9333EA (Purple) for highlights
+- Background: Clean white with subtle tints
+
+## TYPOGRAPHY HIERARCHY:
+- Main title: 42-48px, 700 weight, gradient text effect
+- Section titles: 20-24px, 600 weight
+- Process labels: 12-16px, 500 weight
+- Technical details: 10-12px, 400 weight
+- Code text: 10-12px, monospace font (Monaco, Menlo)
+- Annotations: 9-11px, 400 weight
+
+## LAYOUT ARCHITECTURE OPTIONS:
+
+### OPTION 1: Split Comparison Layout (45% | 10% | 45%)
+- Left side: Traditional/existing method workflow
+- Center: VS comparison with key metrics
+- Right side: New/improved method workflow
+- Use for: Traditional vs GRPO, Naive RAG vs Graph RAG
+
+### OPTION 2: Process Flow Layout (Top-to-Bottom)
+- 3-4 major horizontal sections
+- Each section shows sequential steps
+- Clear input → processing → output flow
+- Use for: GRPO process, MUVERA steps, training pipelines
+
+### OPTION 3: Architecture Diagram Layout
+- Layered system components
+- Data flow between layers with arrows
+- Component responsibilities clearly labeled
+- Integration points highlighted
+- Use for: Multimodal RAG, Elysia framework, system architectures
+
+### OPTION 4: Step-by-Step Process (4-6 Steps)
+- Numbered sections with colored backgrounds
+- Each step shows sub-processes
+- Progressive revelation of complexity
+- Use for: MUVERA explained, training workflows
+
+## COMPONENT SPECIFICATIONS:
+
+### TITLE SECTION:
+- Main title: 44px, 700 weight, gradient or solid color
+- Subtitle: 16-18px, normal weight, muted color
+- Hook statistic: Prominent callout box with key metric
+- Accent line: 4-6px colored bar under title
+
+### SECTION CONTAINERS:
+- Background: Subtle colored tint (5-10% opacity) or solid dark panels
+- Border: 2-3px solid colored border with rounded corners (12-16px)
+- Padding: 25-40px internal spacing
+- Section numbers: Large (60-80px) or circular badges (40px)
+- Hover effects: Subtle lift and shadow enhancement
+
+### WORKFLOW ELEMENTS:
+- Process boxes: 120-200px width, 40-80px height
+- Box styling: White/dark background, colored border, subtle shadow
+- Text: 12-16px, medium weight, high contrast
+- Connection arrows: 2-3px stroke, colored, with arrowheads
+- Flow indicators: Curved or straight paths showing direction
+
+### CODE BLOCKS (for technical content):
+- Background: Dark (#1a1a1a) with colored border
+- Font: Monospace (Monaco, Menlo, Consolas)
+- Syntax highlighting: Blue keywords, green strings, yellow numbers
+- Size: 10-12px for readability
+- Comments: Gray color (#9ca3af)
+
+### TECHNICAL ANNOTATIONS:
+- Leader lines: Thin colored lines (1-2px)
+- Annotation boxes: Small rounded rectangles
+- Performance metrics: Highlighted in colored boxes
+- Cost/time indicators: Badge-style callouts
+- Success rates: Progress bar or percentage displays
+
+## CONTENT STRUCTURE TEMPLATES:
+
+### FOR AI/ML COMPARISON INFOGRAPHICS:
+- [MAIN_TITLE]: "Traditional [Method] vs [New Method]"
+- [HOOK_STAT]: Cost reduction, time savings, or performance improvement
+- [SECTION_1]: Traditional approach workflow (4-6 steps)
+- [SECTION_2]: New approach workflow (4-6 steps)
+- [METRICS]: Side-by-side performance comparison
+- [KEY_INSIGHT]: Bottom summary of main advantage
+
+### FOR PROCESS/ARCHITECTURE INFOGRAPHICS:
+- [MAIN_TITLE]: "[Technology/Method] Explained"
+- [SUBTITLE]: Brief description of what it does
+- [PROCESS_STEPS]: 3-6 numbered stages
+- [TECHNICAL_DETAILS]: Code snippets, formulas, or specifications
+- [FLOW_ARROWS]: Clear data/process flow indicators
+- [PERFORMANCE_NOTES]: Speed, accuracy, efficiency metrics
+
+### FOR SYSTEM ARCHITECTURE:
+- [MAIN_TITLE]: "Introducing [System Name]"
+- [ARCHITECTURE_LAYERS]: Data → Processing → Output layers
+- [COMPONENT_LABELS]: Clear naming of each system component
+- [DATA_FLOW]: Arrows showing information movement
+- [INTEGRATION_POINTS]: Highlighted connection areas
+
+## SPECIFIC AI/ML VISUAL ELEMENTS:
+
+### Neural Network Style:
+- Nodes: Circles connected with lines
+- Layers: Grouped node collections
+- Activation: Color-coded node states
+- Connections: Weighted line thickness
+
+### Data Flow Indicators:
+- Vector embeddings: Small dot patterns
+- Model training: Circular progress indicators
+- Feedback loops: Curved arrows returning to start
+- Parallel processing: Multiple parallel paths
+
+### Performance Visualizations:
+- Training curves: Simple line charts
+- Accuracy metrics: Percentage circles or bars
+- Cost comparisons: Dollar amounts in contrasting colors
+- Time savings: Clock icons with before/after
+
+## MODERN DESIGN ENHANCEMENTS:
+
+### Interactive Elements:
+- Hover states: Subtle transforms (translateY(-3px))
+- Color transitions: Smooth border/background changes
+- Shadow effects: Multi-layered drop shadows
+- Glow effects: Subtle colored glows on key elements
+
+### Advanced Visual Features:
+- Glassmorphism: Semi-transparent panels with backdrop blur
+- Gradient borders: Multi-color border effects
+- Animated connectors: Subtle pulse or flow animations
+- Emphasis circles: Thin colored circles highlighting key areas
+
+### Technical Styling:
+- Code syntax highlighting: Consistent color coding
+- System diagrams: Clean geometric shapes
+- Flow charts: Professional connector styles
+- Metric displays: Dashboard-style number presentations
+
+## EXPORT REQUIREMENTS:
+- High resolution: 2400x2400px for Retina displays
+- Sharp text: Vector-based typography
+- Social media optimized: Readable at 300x300px mobile size
+- Print quality: Professional presentation ready
+- Format options: PNG for social, SVG for scalability
+
+## CONTENT ADAPTATION GUIDELINES:
+
+### For DeepSeek/GRPO Content:
+- Emphasize code-driven vs data-driven approach
+- Show reward function examples in code blocks
+- Highlight cost savings ($512 vs $50K)
+- Include reasoning emergence visualization
+
+### For RAG System Comparisons:
+- Vector database representations
+- Query → Retrieval → Generation flow
+- Knowledge graph visualizations
+- Multi-step retrieval processes
+
+### For Training Pipeline Architecture:
+- GPU cluster representations
+- Data preprocessing stages
+- Model versioning workflows
+- Evaluation loop visualizations
+
+## FINAL QUALITY CHECKLIST:
+✓ Consistent 8px grid spacing throughout
+✓ Readable text at all zoom levels
+✓ High contrast ratios (4.5:1 minimum)
+✓ Professional color palette (2-3 colors max)
+✓ Clear information hierarchy
+✓ Actionable insights prominently displayed
+✓ Technical accuracy in all diagrams
+✓ Modern, cutting-edge aesthetic
+✓ LinkedIn-optimized dimensions and quality
+
+## OUTPUT FORMAT:
+Generate complete HTML/CSS with inline styles for immediate use, ensuring:
+- Pixel-perfect alignment to grid
+- Crisp vector-style graphics
+- Responsive hover interactions
+- Professional documentation quality
+- Ready for high-resolution export
+
+## CONTENT-SPECIFIC EXAMPLES:
+
+### GRPO vs Traditional Fine-tuning:
+```
+Title: "GRPO vs Traditional Fine-tuning: The $512 Revolution"
+Layout: Split comparison (45% | 10% | 45%)
+Left: Traditional (Data Creation → Training → Iteration)
+Right: GRPO (Reward Function → Sampling → Optimization)
+Metrics: Cost ($50K vs $512), Time (6 months vs 32 hours), Team (15+ vs 1)
+```
+
+### RAG Architecture:
+```
+Title: "Naive RAG vs Graph RAG: Enhanced Retrieval"
+Layout: Process flow with branching
+Top: Query processing
+Middle: Vector search vs Graph traversal
+Bottom: Context generation and response
+```
+
+### Training Pipeline:
+```
+Title: "AI Model Training Architecture"
+Layout: Layered system components
+Layers: Data → Processing → Training → Evaluation → Deployment
+Components: GPU clusters, model stores, evaluation loops
+```
+
+## TECHNICAL SPECIFICATIONS:
+
+### CSS Variables for Consistency:
+[css]
+:root {
+  --primary-teal: #008B8B;
+  --secondary-cyan: #20B2AA;
+  --accent-purple: #9370DB;
+  --text-dark: #1A202C;
+  --border-radius: 12px;
+  --shadow-subtle: 0 4px 12px rgba(0,0,0,0.1);
+  --spacing-unit: 8px;
+}
+[/css]
+
+### Grid System:
+- 12-column grid with 8px base spacing
+- Section widths: multiples of 96px (8px × 12)
+- Consistent gaps: 16px, 24px, 32px, 40px
+- Responsive breakpoints at 768px and 1024px
+
+### Animation Guidelines:
+- Hover transitions: 0.2-0.3s ease
+- Transform effects: translateY(-3px) for lift
+- Color transitions: smooth border/background changes
+- Stagger delays: 0.1s increments for sequential elements
+
+## ACCESSIBILITY REQUIREMENTS:
+- Minimum contrast ratio: 4.5:1 for normal text, 3:1 for large text
+- Semantic HTML structure with proper headings
+- Alt text for all visual elements
+- Keyboard navigation support
+- Screen reader compatible markup
+- Focus indicators for interactive elements
+
+## EXPORT OPTIMIZATION:
+- SVG elements for scalable graphics
+- Optimized PNG for photographic elements
+- WebP format for modern browsers
+- Retina display support (2x pixel density)
+- Compression optimized for social media platforms
+- Print-ready CMYK color profiles available
+
+## QUALITY ASSURANCE CHECKLIST:
+✓ Information hierarchy is clear and logical
+✓ All technical details are accurate
+✓ Color coding is consistent throughout
+✓ Typography scales properly at all sizes
+✓ Interactive elements provide clear feedback
+✓ Loading performance is optimized
+✓ Cross-browser compatibility verified
+✓ Mobile responsiveness tested
+✓ Professional presentation standards met
+✓ Brand guidelines compliance (if applicable)
+
+## VERSIONING AND ITERATION:
+- Version 1.0: Core structure and content
+- Version 1.1: Visual polish and refinements
+- Version 1.2: Performance optimizations
+- Include version stamp in footer
+- Maintain design system documentation
+- Track performance metrics and engagement
+
+This comprehensive prompt ensures professional-quality technical infographics that combine cutting-edge design with clear information architecture, suitable for LinkedIn sharing and professional presentations.
+Generate complete HTML/CSS with inline styles that creates a STATIC INFOGRAPHIC IMAGE suitable for screenshot/export to LinkedIn. The HTML should render as a single 1200x1200px infographic that captures the entire workflow/process in one comprehensive visual.
+
+Design Requirements:
+- Professional software architecture diagram style
+- Modern AI/ML visualization aesthetics
+- Square format (1200x1200px) for LinkedIn
+- Clean layout with proper spacing
+- Professional color scheme (teals, blues, purples)
+- Clear workflow steps with arrows
+- Technical details in code blocks where relevant
+- Metrics and performance indicators
+- Modern gradient backgrounds
+- Complete HTML with embedded CSS
+
+"""
+
+def build_workflow_prompt(video_content):
+    """Build the video-specific part of the Claude prompt, sent after WORKFLOW_INSTRUCTIONS"""
+    return f"""Use the video information below to create the infographic; do not output it.
+Video Title: {video_content['title']}
+Channel: {video_content['channel']}
+Content: {video_content['full_text']}
+
+Output only the complete HTML code starting with <!DOCTYPE html>
+"""
+
+def build_workflow_request(video_content):
+    """Claude request arguments with prompt-cache breakpoints after the shared instructions and the video content
+    
+    The instructions are identical for every video, so their cache entry is
+    reused across videos; the second breakpoint lets a regeneration (or a
+    continuation) of the same video reuse the video content as well.
+    """
+    return {
+        'system': [
+            {"type": "text", "text": WORKFLOW_INSTRUCTIONS, "cache_control": {"type": "ephemeral"}}
+        ],
+        'messages': [{
+            "role": "user",
+            "content": [
+                {"type": "text", "text": build_workflow_prompt(video_content), "cache_control": {"type": "ephemeral"}}
+            ]
+        }],
+    }
+
+def generate_workflow_html(video_content, on_progress=None, mode=None):
+    """Generate workflow visualization HTML using Claude
+    
+    The response is streamed and cleaned as it arrives; `on_progress` receives
+    a StreamProgress after every fragment. A document that is cut off (by
+    `max_tokens` or a dropped stream) is resumed with continuation requests
+    instead of being regenerated, and closed locally if it is still unfinished.
+    With `mode='spec'` (default: WORKFLOW_MODE) Claude only writes a JSON spec
+    and the document is rendered locally; `on_progress` is not called.
+    """
+    mode = mode or WORKFLOW_MODE
+    if mode not in WORKFLOW_MODES:
+        return f"Error generating workflow: unknown mode '{mode}'"
+    if mode == 'spec':
+        return generate_workflow_from_spec(video_content)
+    
+    request = build_workflow_request(video_content)
+    
+    with stage_span('workflow_html') as span:
+        try:
+            # Markdown fences are dropped and DOCTYPE added while the document streams in
+            assembler = HtmlStreamAssembler()
+            progress = StreamProgress()
+            
+            stream_workflow_html(request, assembler, progress, on_progress)
+            for _ in range(WORKFLOW_MAX_CONTINUATIONS):
+                if assembler.complete or not assembler.started:
+                    break
+                record_repair('continuation')
+                stream_workflow_html(build_continuation_request(request, assembler.html), assembler, progress, on_progress)
+            
+            if assembler.started and not assembler.complete:
+                record_repair('closed_tags')
+                return assembler.close_document()
+            return assembler.html
+        except Exception as e:
+            span.fail(e)
+            return f"Error generating workflow: {str(e)}"
+
+def stream_workflow_html(request, assembler, progress, on_progress=None):
+    """Stream one Claude response into the assembler, stopping as soon as </html> arrives"""
+    with get_anthropic_client().messages.stream(
+        model=WORKFLOW_MODEL,
+        max_tokens=WORKFLOW_MAX_TOKENS,
+        **request
+    ) as stream:
+        for text in stream.text_stream:
+            progress.update(text)
+            if on_progress:
+                on_progress(progress)
+            
+            # Leaving the block closes the stream
+            if assembler.feed(text):
+                break
+        record_stream_usage(stream)
+
+def build_continuation_request(request, partial_html):
+    """The original request with the partial document as an assistant prefill, so Claude resumes where it stopped
+    
+    The prompt-cache breakpoints of the original request still apply, so the
+    instructions and video content are read from the cache.
+    """
+    # The API rejects a prefill that ends in whitespace
+    prefill = {"role": "assistant", "content": partial_html.rstrip()}
+    return dict(request, messages=request['messages'] + [prefill])
+
+def generate_workflow_spec(video_content):
+    """Ask Claude for the infographic content as a normalized JSON spec; raises on failure"""
+    message = get_anthropic_client().messages.create(
+        model=WORKFLOW_MODEL,
+        max_tokens=WORKFLOW_SPEC_MAX_TOKENS,
+        **build_spec_request(video_content)
+    )
+    record_message_usage(message)
+    return parse_spec(message)
+
+def generate_workflow_from_spec(video_content):
+    """Generate workflow visualization HTML from a Claude-written spec and the local Jinja2 template
+    
+    Claude spends a few hundred output tokens on the content instead of
+    thousands on hand-written CSS and markup.
+    """
+    with stage_span('workflow_spec') as span:
+        try:
+            spec = generate_workflow_spec(video_content)
+        except Exception as e:
+            span.fail(e)
+            return f"Error generating workflow: {str(e)}"
+    
+    with stage_span('workflow_template') as span:
+        try:
+            return render_infographic(spec, video_content)
+        except Exception as e:
+            span.fail(e)
+            return f"Error generating workflow: {str(e)}"
+
+def record_stream_usage(stream):
+    """Report the usage and stop reason of an Anthropic stream, which may have been left before its final event
+    
+    A stream left early has no stop reason yet.
+    """
+    record_message_usage(getattr(stream, 'current_message_snapshot', None))
+
+def record_message_usage(message):
+    """Report the usage and stop reason of a (possibly partial) Claude message
+    
+    Anthropic's `input_tokens` excludes prompt-cache reads and writes, so they
+    are added back to report the full prompt size.
+    """
+    usage = getattr(message, 'usage', None)
+    if usage is not None:
+        cache_read = getattr(usage, 'cache_read_input_tokens', 0) or 0
+        cache_write = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+        record_usage(WORKFLOW_MODEL, usage.input_tokens + cache_read + cache_write, usage.output_tokens, cache_read)
+    record_stop_reason(WORKFLOW_MODEL, getattr(message, 'stop_reason', None))
+
+def html_to_image_simple(html_content, backend=None):
+    """Convert HTML to PNG bytes using the shared, pre-warmed renderer pool
+    
+    `backend` picks a renderer other than the process default, e.g. 'svg' to
+    draw a compact-mode infographic without a browser.
+    """
+    with stage_span('render_png') as span:
+        try:
+            # Each render gets its own page/output path, so concurrent sessions don't collide
+            return get_renderer(backend).render(html_content)
+        except Exception as e:
+            span.fail(e)
+            return None
+
+def export_infographic(image_data, formats=None):
+    """Derive every size variant and the carousel PDF from one rendered PNG
+    
+    Returns `{file name: bytes}`, e.g. `portrait.webp` or `carousel.pdf`.
+    Encoding and worker pool errors propagate so callers can report them.
+    """
+    with stage_span('export_images'):
+        return export_images(image_data, formats)
+
+# ---- MAIN GENERATION FUNCTION ----
+
+def generate_all_template_posts(video_content, video_url, fresh=False, on_delta=None):
+    """Generate LinkedIn posts using all 5 templates for user selection.
+    
+    Identical prompts are served from the response cache unless `fresh` is set.
+    If `on_delta` is given, the five posts are streamed and every text fragment
+    is reported as `on_delta(template_name, text)` from a worker thread.
+    """
+    
+    def template_delta(template_name):
+        if on_delta is None:
+            return None
+        return lambda text: on_delta(template_name, text)
+    
+    # Start all seven LLM calls at once; the pool size caps requests in flight
+    with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_LLM_CALLS) as executor:
+        # Each call runs in a copy of the caller's context so its stage span joins the caller's run
+        post_futures = {
+            template_name: executor.submit(
+                contextvars.copy_context().run,
+                generate_post, template_name, video_content, video_url, fresh, template_delta(template_name)
+            )
+            for template_name in POST_TEMPLATES
+        }
+        pinned_future = executor.submit(contextvars.copy_context().run, generate_pinned_comment, video_content, fresh)
+        hashtags_future = executor.submit(contextvars.copy_context().run, generate_hashtags, video_content, fresh)
+        
+        # Collect results, keeping one failure from taking down the others
+        all_posts = {}
+        
+        for template_name, future in post_futures.items():
+            try:
+                all_posts[template_name] = future.result()
+            except Exception as e:
+                all_posts[template_name] = f"Error generating this template: {str(e)}"
+        
+        try:
+            pinned_comment = pinned_future.result()
+        except Exception as e:
+            pinned_comment = f"Error generating pinned comment: {str(e)}"
+        
+        try:
+            hashtags = hashtags_future.result()
+        except Exception:
+            hashtags = "#AI #MachineLearning #TMLS"
+    
+    return all_posts, pinned_comment, hashtags
+
+def find_reusable_posts(video_id, video_content, video_url):
+    """Return `(all_posts, pinned_comment, hashtags, match)` from a near-duplicate video, or None.
+
+    Re-uploads (trimmed, clip or full-length versions under another ID) have
+    nearly the same text, so their earlier posts are reused with the links
+    pointed at `video_url`. `match` describes the video they came from; the
+    video's own entry (`video_id`) is never a match.
+    """
+    # Imported here so NumPy only loads once the index is needed
+    from linkedin_generator.near_duplicates import duplicate_index, retarget_outputs
+
+    with stage_span('near_duplicate'):
+        match = duplicate_index.find(video_content, exclude=video_id)
+    if match is None or set(match['outputs'].get('posts', {})) != set(POST_TEMPLATES):
+        return None
+    outputs = retarget_outputs(match.pop('outputs'), match['video_url'], video_url)
+    return outputs['posts'], outputs['pinned_comment'], outputs['hashtags'], match
+
+def remember_posts(video_id, video_content, video_url, all_posts, pinned_comment, hashtags):
+    """Index a video's generated posts so near-duplicate uploads can reuse them; failed runs are skipped"""
+    from linkedin_generator.near_duplicates import duplicate_index
+
+    # Error text, missing or malformed outputs mean the run failed and must not be reused
+    if not all(isinstance(output, str) and not output.startswith("Error generating")
+               for output in [*all_posts.values(), pinned_comment, hashtags]):
+        return
+    duplicate_index.add(video_id, video_content, video_url, {
+        'posts': all_posts,
+        'pinned_comment': pinned_comment,
+        'hashtags': hashtags,
+    })
+
+def generate_all_template_posts_combined(video_content, video_url, fresh=False):
+    """Generate all templates, the pinned comment and hashtags in one structured-output call.
+    
+    The video content is sent once instead of seven times, trading some latency
+    for input tokens; see benchmarks/combined_vs_fanout.py.
+    """
+    try:
+        with stage_span('combined'):
+            return run_combined_templates(get_openai_client(), video_content, video_url, fresh)
+    except Exception:
+        # Fall back to the per-template fan-out, which isolates failures per call
+        return generate_all_template_posts(video_content, video_url, fresh)
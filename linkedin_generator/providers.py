@@ -0,0 +1,137 @@
+"""Lazily constructed API clients.
+
+SDKs are imported and clients built the first time each provider is used, so
+importing the apps stays cheap and a missing key only fails the feature that
+needs it. Every client goes through the shared adaptive rate limiting and
+retry layer in `linkedin_generator.rate_limit`.
+"""
+import json
+import os
+import threading
+
+from linkedin_generator.rate_limit import call_with_retries, parse_reset_seconds
+
+# ---- CONFIGURATION ----
+
+YOUTUBE_HTTP_TIMEOUT_SECONDS = float(os.getenv("YOUTUBE_HTTP_TIMEOUT_SECONDS", "30"))
+
+# ---- CLIENT REGISTRY ----
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def _get_or_create(name, factory):
+    client = _clients.get(name)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = factory()
+    return client
+
+
+def override_client(name, client):
+    """Install a client for a provider, e.g. a recording wrapper or a local fake."""
+    with _clients_lock:
+        _clients[name] = client
+
+
+def reset_clients():
+    """Forget every constructed client so the next use builds a new one."""
+    with _clients_lock:
+        _clients.clear()
+
+# ---- PROVIDERS ----
+
+def get_openai_client():
+    """Return the shared OpenAI client."""
+    def create():
+        from openai import DefaultHttpxClient, OpenAI
+        from linkedin_generator.http_transport import RateLimitedTransport
+        return OpenAI(
+            api_key=os.environ["OPENAI_API_KEY"],
+            max_retries=0,
+            http_client=DefaultHttpxClient(transport=RateLimitedTransport('openai'))
+        )
+    return _get_or_create('openai', create)
+
+
+def get_anthropic_client():
+    """Return the shared Anthropic client."""
+    def create():
+        import anthropic
+        from linkedin_generator.http_transport import RateLimitedTransport
+        return anthropic.Anthropic(
+            api_key=os.getenv("ANTHROPIC_API_KEY"),
+            max_retries=0,
+            http_client=anthropic.DefaultHttpxClient(transport=RateLimitedTransport('anthropic'))
+        )
+    return _get_or_create('anthropic', create)
+
+
+def get_youtube_client():
+    """Return the shared YouTube Data API service object.
+
+    The discovery document is loaded once from the copy bundled with
+    google-api-python-client instead of being fetched over the network.
+    Run requests with `execute_youtube` so each thread uses its own transport.
+    """
+    def create():
+        from googleapiclient.discovery import build
+        return build(
+            'youtube', 'v3',
+            developerKey=os.getenv("YOUTUBE_API_KEY"),
+            static_discovery=True,
+            cache_discovery=False
+        )
+    return _get_or_create('youtube', create)
+
+
+def get_transcript_client():
+    """Return the shared youtube-transcript-api client used to fetch caption tracks."""
+    def create():
+        from youtube_transcript_api import YouTubeTranscriptApi
+        return YouTubeTranscriptApi()
+    return _get_or_create('transcripts', create)
+
+
+_youtube_transport = threading.local()
+
+
+# Per-user and per-second limits clear quickly; the daily `quotaExceeded` does not
+YOUTUBE_THROTTLE_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded'}
+
+
+def _youtube_retry_verdict(error):
+    """Classify a failed YouTube call for `call_with_retries`."""
+    from googleapiclient.errors import HttpError
+
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return False, None
+    if not isinstance(error, HttpError):
+        return None
+    status = error.resp.status
+    try:
+        reasons = {detail.get('reason') for detail in json.loads(error.content)['error']['errors']}
+    except (ValueError, KeyError, TypeError, AttributeError):
+        reasons = set()
+    if status == 429 or (status == 403 and reasons & YOUTUBE_THROTTLE_REASONS):
+        return True, parse_reset_seconds(error.resp.get('retry-after'))
+    if status >= 500:
+        return False, None
+    return None
+
+
+def execute_youtube(request):
+    """Execute a YouTube API request over this thread's persistent HTTP connection.
+
+    httplib2 transports are not thread-safe, so each thread keeps one of its
+    own and reuses it (and its keep-alive connection) for every call. Calls
+    are rate limited and transient failures retried with jittered backoff.
+    """
+    http = getattr(_youtube_transport, 'http', None)
+    if http is None:
+        import httplib2
+        http = _youtube_transport.http = httplib2.Http(timeout=YOUTUBE_HTTP_TIMEOUT_SECONDS)
+    return call_with_retries('youtube', lambda: request.execute(http=http), _youtube_retry_verdict)
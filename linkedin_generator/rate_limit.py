@@ -0,0 +1,235 @@
+"""Thread-safe rate limiting shared by concurrent workers and every API provider."""
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+# ---- TOKEN BUCKET ----
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, bursting up to `capacity`."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def acquire(self, tokens=1):
+        """Block until `tokens` are available, then take them."""
+        if tokens > self.capacity:
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of {self.capacity}")
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait = (tokens - self._tokens) / self.rate
+            time.sleep(wait)
+
+# ---- ADAPTIVE PROVIDER LIMITS ----
+
+# Starting (and maximum) request rates; each limiter slows down when throttled
+PROVIDER_REQUESTS_PER_MINUTE = {
+    'openai': float(os.getenv("OPENAI_REQUESTS_PER_MINUTE", "500")),
+    'anthropic': float(os.getenv("ANTHROPIC_REQUESTS_PER_MINUTE", "50")),
+    'youtube': float(os.getenv("YOUTUBE_REQUESTS_PER_MINUTE", "600")),
+}
+
+# API requests in flight across all providers (streams count until they are closed)
+MAX_CONCURRENT_API_CALLS = int(os.getenv("MAX_CONCURRENT_API_CALLS", "16"))
+
+API_MAX_RETRIES = int(os.getenv("API_MAX_RETRIES", "5"))
+API_BACKOFF_BASE_SECONDS = float(os.getenv("API_BACKOFF_BASE_SECONDS", "1"))
+API_BACKOFF_MAX_SECONDS = float(os.getenv("API_BACKOFF_MAX_SECONDS", "60"))
+
+# Never slow a provider below this share of its configured rate
+MIN_RATE_FRACTION = 0.05
+
+# Each successful call wins back this share of the configured rate
+RATE_RECOVERY_FRACTION = 0.05
+
+# Pause new requests when fewer tokens than about one large prompt remain in the window
+LOW_TOKEN_HEADROOM = 8000
+
+_DURATION_PART = re.compile(r'(\d+(?:\.\d+)?)(ms|h|m|s)')
+_DURATION_SECONDS = {'ms': 0.001, 's': 1, 'm': 60, 'h': 3600}
+
+
+def parse_reset_seconds(value, now=None):
+    """Seconds until a rate-limit window resets.
+
+    Accepts plain seconds (`retry-after`), OpenAI durations such as `6m0s` or
+    `250ms`, and Anthropic RFC 3339 timestamps. Returns None if unparseable.
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if parts and ''.join(number + unit for number, unit in parts) == value:
+        return sum(float(number) * _DURATION_SECONDS[unit] for number, unit in parts)
+    try:
+        reset_at = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+    now = now or datetime.now(timezone.utc)
+    return max((reset_at - now).total_seconds(), 0.0)
+
+
+def backoff_delay(attempt, retry_after=None):
+    """Full-jitter exponential backoff, never shorter than a server-sent `retry-after`."""
+    delay = random.uniform(0, min(API_BACKOFF_MAX_SECONDS, API_BACKOFF_BASE_SECONDS * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, retry_after + random.uniform(0, API_BACKOFF_BASE_SECONDS))
+    return delay
+
+
+class AdaptiveRateLimiter(TokenBucket):
+    """A per-provider token bucket that tunes itself from the provider's responses.
+
+    The rate is halved whenever the provider throttles a request and creeps
+    back toward the configured maximum with every success. Rate-limit headers
+    reporting an exhausted window pause new requests until it resets.
+    """
+
+    def __init__(self, name, requests_per_minute):
+        self.name = name
+        self.max_rate = requests_per_minute / 60
+        super().__init__(rate=self.max_rate, capacity=max(1.0, self.max_rate))
+        self._paused_until = 0.0
+        self.throttled = 0
+        self.retries = 0
+
+    def acquire(self, tokens=1):
+        """Wait out any pause, then take tokens from the bucket."""
+        while True:
+            with self._lock:
+                wait = self._paused_until - time.monotonic()
+            if wait <= 0:
+                break
+            time.sleep(wait)
+        super().acquire(tokens)
+
+    def pause(self, seconds):
+        """Hold new requests for `seconds`."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def record_retry(self):
+        with self._lock:
+            self.retries += 1
+
+    def record_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_RECOVERY_FRACTION)
+
+    def record_throttled(self, retry_after=None):
+        """Slow down after a 429 (or quota error) from the provider."""
+        with self._lock:
+            self.throttled += 1
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.max_rate * MIN_RATE_FRACTION, self.rate / 2)
+            self._tokens = min(self._tokens, 0)
+            if retry_after is not None:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+    def observe_headers(self, headers):
+        """Pause until reset when the provider reports an (almost) exhausted window."""
+        for remaining_header, reset_header, floor in RATE_LIMIT_HEADERS.get(self.name, ()):
+            remaining = headers.get(remaining_header)
+            if remaining is None:
+                continue
+            try:
+                remaining = float(remaining)
+            except ValueError:
+                continue
+            if remaining <= floor:
+                reset = parse_reset_seconds(headers.get(reset_header))
+                if reset:
+                    self.pause(reset)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'requests_per_minute': round(self.rate * 60, 1),
+                'max_requests_per_minute': round(self.max_rate * 60, 1),
+                'throttled': self.throttled,
+                'retries': self.retries,
+            }
+
+
+# (remaining header, reset header, pause when remaining is at or below this)
+RATE_LIMIT_HEADERS = {
+    'openai': [
+        ('x-ratelimit-remaining-requests', 'x-ratelimit-reset-requests', 0),
+        ('x-ratelimit-remaining-tokens', 'x-ratelimit-reset-tokens', LOW_TOKEN_HEADROOM),
+    ],
+    'anthropic': [
+        ('anthropic-ratelimit-requests-remaining', 'anthropic-ratelimit-requests-reset', 0),
+        ('anthropic-ratelimit-tokens-remaining', 'anthropic-ratelimit-tokens-reset', LOW_TOKEN_HEADROOM),
+    ],
+}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+# Shared by every provider so a burst on one cannot starve the process of connections
+api_slots = threading.BoundedSemaphore(MAX_CONCURRENT_API_CALLS)
+
+
+def get_limiter(provider):
+    """Return the process-wide limiter for a provider."""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = _limiters[provider] = AdaptiveRateLimiter(
+                provider, PROVIDER_REQUESTS_PER_MINUTE[provider]
+            )
+        return limiter
+
+
+def limiter_stats():
+    """Current rate and throttling counters for every provider used so far."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.stats() for limiter in limiters}
+
+
+def call_with_retries(provider, func, classify):
+    """Run `func()` under the provider's limiter and the global slots, retrying transient errors.
+
+    `classify(error)` returns None for errors that should propagate at once,
+    otherwise `(throttled, retry_after_seconds)`.
+    """
+    limiter = get_limiter(provider)
+    for attempt in range(API_MAX_RETRIES + 1):
+        limiter.acquire()
+        try:
+            with api_slots:
+                result = func()
+        except Exception as e:
+            verdict = classify(e)
+            if verdict is None or attempt == API_MAX_RETRIES:
+                raise
+            throttled, retry_after = verdict
+            if throttled:
+                limiter.record_throttled(retry_after)
+            limiter.record_retry()
+            time.sleep(backoff_delay(attempt, retry_after))
+        else:
+            limiter.record_success()
+            return result
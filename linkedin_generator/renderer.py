@@ -0,0 +1,199 @@
+"""Pooled HTML-to-PNG rendering for infographic export.
+
+Three backends are available:
+
+- `PlaywrightRenderer` keeps one headless Chromium warm for the whole process
+  and screenshots straight to memory (needs `playwright install chromium`
+  once after installing the requirements).
+- `Html2ImageRenderer` pools `Html2Image` instances, each writing to its own
+  private directory so concurrent sessions never overwrite each other.
+  Html2Image still starts a new headless Chromium for every screenshot, so
+  this backend only bounds concurrency; it does not keep a browser warm.
+- `SvgRenderer` needs no browser: it redraws compact-mode infographics from
+  the spec embedded in their HTML (see infographic_svg.py). Documents Claude
+  wrote by hand in HTML mode cannot be drawn this way.
+
+The process-wide default renderer comes from RENDER_BACKEND; a different
+backend can be requested per call with `get_renderer(backend)`.
+"""
+import asyncio
+import contextlib
+import os
+import queue
+import tempfile
+import threading
+import uuid
+
+# ---- CONFIGURATION ----
+
+INFOGRAPHIC_SIZE = (1200, 1200)
+
+# auto (Playwright when available, else html2image, else svg) | playwright | html2image | svg
+RENDER_BACKENDS = ('auto', 'playwright', 'html2image', 'svg')
+RENDER_BACKEND = os.getenv("RENDER_BACKEND", "auto")
+
+# Renders allowed at once; each one holds a browser page or Chromium process
+RENDER_POOL_SIZE = int(os.getenv("RENDER_POOL_SIZE", "2"))
+RENDER_TIMEOUT_SECONDS = float(os.getenv("RENDER_TIMEOUT_SECONDS", "60"))
+
+# ---- BACKENDS ----
+
+class PlaywrightRenderer:
+    """A long-lived headless Chromium with a fixed pool of pages.
+
+    Playwright objects are bound to the event loop that created them, so the
+    browser lives on a dedicated background thread and callers from any
+    thread submit work to it.
+    """
+
+    def __init__(self, size=INFOGRAPHIC_SIZE, pool_size=RENDER_POOL_SIZE):
+        from playwright.async_api import async_playwright
+
+        self.size = size
+        self._async_playwright = async_playwright
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="infographic-renderer", daemon=True)
+        self._thread.start()
+        try:
+            self._submit(self._start(pool_size)).result(timeout=RENDER_TIMEOUT_SECONDS)
+        except Exception:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            raise
+
+    def _submit(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    async def _start(self, pool_size):
+        self._playwright = await self._async_playwright().start()
+        self._browser = await self._playwright.chromium.launch()
+        self._pages = asyncio.Queue()
+        self._missing = 0
+        for _ in range(pool_size):
+            self._pages.put_nowait(await self._new_page())
+
+    async def _new_page(self):
+        width, height = self.size
+        return await self._browser.new_page(viewport={'width': width, 'height': height})
+
+    async def _refill(self):
+        """Open replacements for pages dropped after failed renders, while the browser allows it."""
+        while self._missing:
+            try:
+                page = await self._new_page()
+            except Exception:
+                return
+            self._missing -= 1
+            self._pages.put_nowait(page)
+
+    async def _render(self, html):
+        await self._refill()
+        page = await self._pages.get()
+        try:
+            await page.set_content(html, wait_until='networkidle')
+            return await page.screenshot(type='png')
+        except Exception:
+            # Drop a page that may be left in a bad state; only a freshly opened page rejoins the pool
+            with contextlib.suppress(Exception):
+                await page.close()
+            page = None
+            self._missing += 1
+            await self._refill()
+            raise
+        finally:
+            if page is not None:
+                self._pages.put_nowait(page)
+
+    def render(self, html):
+        """Return the PNG bytes for an HTML document."""
+        return self._submit(self._render(html)).result(timeout=RENDER_TIMEOUT_SECONDS)
+
+
+class Html2ImageRenderer:
+    """A bounded pool of `Html2Image` instances with isolated output directories."""
+
+    def __init__(self, size=INFOGRAPHIC_SIZE, pool_size=RENDER_POOL_SIZE):
+        from html2image import Html2Image
+
+        self.size = size
+        self._pool = queue.Queue()
+        for _ in range(pool_size):
+            workdir = tempfile.mkdtemp(prefix="infographic-")
+            self._pool.put(Html2Image(size=size, output_path=workdir, temp_path=workdir))
+
+    def render(self, html):
+        """Return the PNG bytes for an HTML document, leaving no files behind."""
+        hti = self._pool.get(timeout=RENDER_TIMEOUT_SECONDS)
+        try:
+            name = uuid.uuid4().hex
+            image_path = hti.screenshot(html_str=html, save_as=f"{name}.png")[0]
+            try:
+                with open(image_path, 'rb') as f:
+                    return f.read()
+            finally:
+                for path in (image_path, os.path.join(hti.temp_path, f"{name}.html")):
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(path)
+        finally:
+            self._pool.put(hti)
+
+
+class SvgRenderer:
+    """Draws compact-mode infographics from their embedded spec, in-process and without a browser."""
+
+    def __init__(self, size=INFOGRAPHIC_SIZE):
+        from linkedin_generator.infographic import embedded_spec
+        from linkedin_generator.infographic_svg import layout_infographic, rasterize
+
+        self.size = size
+        self._embedded_spec = embedded_spec
+        self._layout = layout_infographic
+        self._rasterize = rasterize
+
+    def render(self, html):
+        """Return the PNG bytes for a document rendered from a spec; raises ValueError for any other HTML."""
+        embedded = self._embedded_spec(html)
+        if embedded is None:
+            raise ValueError("The svg renderer can only draw compact-mode infographics (no embedded spec found)")
+        return self._rasterize(self._layout(**embedded), self.size)
+
+# ---- SHARED RENDERER ----
+
+# One renderer per backend name; None holds the process-wide default
+_renderers = {}
+_renderer_lock = threading.Lock()
+
+
+def create_renderer(backend=RENDER_BACKEND):
+    """Build a renderer for the requested backend."""
+    if backend not in RENDER_BACKENDS:
+        raise ValueError(f"Unknown render backend '{backend}'")
+    if backend == 'playwright':
+        return PlaywrightRenderer()
+    if backend == 'html2image':
+        return Html2ImageRenderer()
+    if backend == 'svg':
+        return SvgRenderer()
+    try:
+        return PlaywrightRenderer()
+    except Exception:
+        pass
+    try:
+        # Playwright or its browser is not installed; html2image uses the system Chrome
+        return Html2ImageRenderer()
+    except Exception:
+        # No browser at all: only compact-mode infographics can be rendered
+        return SvgRenderer()
+
+
+def set_renderer(renderer, backend=None):
+    """Install the process-wide renderer (or the one for `backend`), e.g. a benchmark fake."""
+    with _renderer_lock:
+        _renderers[backend] = renderer
+
+
+def get_renderer(backend=None):
+    """Return the process-wide renderer, or the one for `backend`, starting it on first use."""
+    with _renderer_lock:
+        if _renderers.get(backend) is None:
+            _renderers[backend] = create_renderer(backend or RENDER_BACKEND)
+        return _renderers[backend]
@@ -0,0 +1,172 @@
+"""Declarative prompt template registry and the single execution path for every template.
+
+Every call is laid out as the shared prefix (instructions plus the video
+content, identical for all of a video's calls) followed by the template's own
+prompt, so providers can serve the prefix from their prompt cache.
+"""
+import json
+import os
+from string import Template
+
+import yaml
+
+from linkedin_generator.llm import chat_completion
+
+# ---- CONFIGURATION ----
+
+TEMPLATES_PATH = os.getenv(
+    "TEMPLATES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates.yaml")
+)
+
+TEMPLATE_KINDS = ('post', 'pinned_comment', 'hashtags')
+
+# ---- REGISTRY ----
+
+class PromptTemplate:
+    """One entry of the registry, with its prompt precompiled as a `string.Template`."""
+
+    def __init__(self, key, kind, prompt, model, temperature, name=None, description="",
+                 engagement_tip=""):
+        self.key = key
+        self.kind = kind
+        self.prompt = Template(prompt)
+        self.model = model
+        self.temperature = temperature
+        self.name = name or key
+        self.description = description
+        self.engagement_tip = engagement_tip
+
+    def render(self, video_content, video_url=""):
+        """Fill the template-specific part of the prompt, sent after the shared prefix."""
+        return self.prompt.substitute(
+            title=video_content['title'],
+            channel=video_content['channel'],
+            full_text=video_content['full_text'],
+            video_url=video_url
+        )
+
+
+def load_registry(path=TEMPLATES_PATH):
+    """Parse and validate the registry file.
+
+    Returns the templates keyed by their ID in file order, the shared prefix,
+    the combined-mode prompt wrapper, and the registry defaults.
+    """
+    with open(path, encoding='utf-8') as f:
+        config = yaml.safe_load(f)
+
+    defaults = config.get('defaults', {})
+    templates = {}
+    for key, entry in config['templates'].items():
+        kind = entry.get('kind', 'post')
+        if kind not in TEMPLATE_KINDS:
+            raise ValueError(f"Template '{key}' has unknown kind '{kind}'")
+        if 'prompt' not in entry:
+            raise ValueError(f"Template '{key}' has no prompt")
+        templates[key] = PromptTemplate(
+            key=key,
+            kind=kind,
+            prompt=entry['prompt'],
+            model=entry.get('model', defaults.get('model', 'gpt-4o')),
+            temperature=entry.get('temperature', defaults.get('temperature', 0.7)),
+            name=entry.get('name'),
+            description=entry.get('description', ""),
+            engagement_tip=entry.get('engagement_tip', "")
+        )
+
+    for kind in ('pinned_comment', 'hashtags'):
+        if not any(template.kind == kind for template in templates.values()):
+            raise ValueError(f"Template registry needs a '{kind}' template")
+    return templates, Template(config['shared_prefix']), Template(config['combined_prompt']), defaults
+
+
+# Parsed once when the module is first imported
+PROMPT_TEMPLATES, SHARED_PREFIX, COMBINED_PROMPT, REGISTRY_DEFAULTS = load_registry()
+
+POST_TEMPLATES = {
+    template.name: template
+    for template in PROMPT_TEMPLATES.values()
+    if template.kind == 'post'
+}
+
+
+def get_template(kind):
+    """Return the first registered template of a non-post kind."""
+    return next(template for template in PROMPT_TEMPLATES.values() if template.kind == kind)
+
+# ---- EXECUTION ----
+
+def render_shared_prefix(video_content):
+    """The system prefix shared by every call about a video: instructions and the video content."""
+    return SHARED_PREFIX.substitute(
+        title=video_content['title'],
+        channel=video_content['channel'],
+        full_text=video_content['full_text']
+    )
+
+
+def run_template(client, template, video_content, video_url="", fresh=False, on_delta=None):
+    """Render a template and run it through the shared, cached completion path."""
+    return chat_completion(
+        client,
+        template.render(video_content, video_url),
+        model=template.model,
+        temperature=template.temperature,
+        fresh=fresh,
+        on_delta=on_delta,
+        system=render_shared_prefix(video_content)
+    )
+
+
+def combined_response_format():
+    """JSON schema with one required string field per registered template."""
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "linkedin_content",
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {key: {"type": "string"} for key in PROMPT_TEMPLATES},
+                "required": list(PROMPT_TEMPLATES),
+                "additionalProperties": False
+            }
+        }
+    }
+
+
+def render_combined_prompt(video_content, video_url=""):
+    """Build the prompt that follows the shared prefix and carries every template's instructions."""
+    sections = "\n\n".join(
+        f'### JSON field "{template.key}"\n{template.render(video_content, video_url).strip()}'
+        for template in PROMPT_TEMPLATES.values()
+    )
+    return COMBINED_PROMPT.substitute(sections=sections)
+
+
+def run_combined_templates(client, video_content, video_url="", fresh=False):
+    """Generate every template in a single structured-output call.
+
+    Returns the same `(all_posts, pinned_comment, hashtags)` tuple as the
+    per-template fan-out, so the results display the same way.
+    """
+    content = chat_completion(
+        client,
+        render_combined_prompt(video_content, video_url),
+        model=REGISTRY_DEFAULTS.get('model', 'gpt-4o'),
+        temperature=REGISTRY_DEFAULTS.get('temperature', 0.7),
+        fresh=fresh,
+        response_format=combined_response_format(),
+        system=render_shared_prefix(video_content)
+    )
+    results = json.loads(content)
+
+    all_posts = {
+        template.name: results.get(template.key) or "Error generating this template: missing from combined response"
+        for template in POST_TEMPLATES.values()
+    }
+    pinned_comment = (results.get(get_template('pinned_comment').key)
+                      or "Error generating pinned comment: missing from combined response")
+    hashtags = results.get(get_template('hashtags').key) or "#AI #MachineLearning #TMLS"
+    return all_posts, pinned_comment, hashtags
@@ -0,0 +1,307 @@
+"""Transcript ingestion and map-reduce summarization into one cached brief per video.
+
+Captions come from a local .vtt/.srt file or the video's YouTube caption
+track. They are read lazily, cut into token-bounded chunks, summarized in
+parallel (map) and merged (reduce) into a short brief. The brief is cached
+per video ID and appended to `full_text`, so every generator shares it
+instead of each resending the whole transcript.
+
+Memory stays bounded because only the chunks in flight are held, and token
+spend is bounded by TRANSCRIPT_MAX_TOKENS; anything beyond it is skipped.
+"""
+import contextvars
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from string import Template
+
+import yaml
+
+from linkedin_generator.html_stream import APPROX_CHARS_PER_TOKEN
+from linkedin_generator.llm import chat_completion
+from linkedin_generator.metrics import stage_span
+from linkedin_generator.providers import get_openai_client, get_transcript_client
+from linkedin_generator.templates import TEMPLATES_PATH
+
+# ---- CONFIGURATION ----
+
+TRANSCRIPT_CACHE_PATH = os.getenv("TRANSCRIPT_CACHE_PATH", os.path.join(".cache", "transcripts.sqlite3"))
+
+# Size of each map chunk; ~20 minutes of speech
+TRANSCRIPT_CHUNK_TOKENS = int(os.getenv("TRANSCRIPT_CHUNK_TOKENS", "4000"))
+
+# Transcript tokens summarized at most; ~4.5 hours of speech
+TRANSCRIPT_MAX_TOKENS = int(os.getenv("TRANSCRIPT_MAX_TOKENS", "60000"))
+
+# Chunk summaries in flight at once
+TRANSCRIPT_MAX_CONCURRENCY = int(os.getenv("TRANSCRIPT_MAX_CONCURRENCY", "4"))
+
+# Notes merged by one reduce call; more are reduced in rounds
+REDUCE_INPUT_TOKENS = 6000
+
+CAPTION_LANGUAGES = ('en', 'en-US', 'en-GB')
+
+_TIMING_LINE = re.compile(r'^\d{1,2}:\d{2}(:\d{2})?[.,]\d{3}\s+-->')
+_MARKUP = re.compile(r'<[^>]+>|\{\\[^}]*\}')
+
+# ---- CAPTIONS ----
+
+def iter_caption_lines(lines):
+    """Yield the spoken text of .vtt or .srt caption lines.
+
+    Cue numbers, timings, headers, NOTE/STYLE blocks and markup are dropped,
+    and the rolling duplicates of auto-generated captions are collapsed.
+    """
+    previous = None
+    skipping_block = False
+    for line in lines:
+        line = line.strip().lstrip('﻿')
+        if not line:
+            skipping_block = False
+            continue
+        if skipping_block or line == 'WEBVTT' or line.startswith(('WEBVTT ', 'Kind:', 'Language:')):
+            continue
+        if line.startswith(('NOTE', 'STYLE', 'REGION')):
+            skipping_block = True
+            continue
+        if line.isdigit() or _TIMING_LINE.match(line):
+            continue
+        text = _MARKUP.sub('', line).strip()
+        if text and text != previous:
+            previous = text
+            yield text
+
+
+def iter_caption_file(caption_file):
+    """Stream the spoken text of a .vtt/.srt file, given as a path or an open binary file."""
+    if isinstance(caption_file, (str, os.PathLike)):
+        with open(caption_file, encoding='utf-8', errors='replace') as f:
+            yield from iter_caption_lines(f)
+        return
+    caption_file.seek(0)
+    text = io.TextIOWrapper(caption_file, encoding='utf-8', errors='replace')
+    try:
+        yield from iter_caption_lines(text)
+    finally:
+        # Leave the caller's file open
+        text.detach()
+
+
+def iter_youtube_captions(video_id):
+    """Stream the text of a video's caption track, or yield nothing if it has none."""
+    try:
+        from youtube_transcript_api import CouldNotRetrieveTranscript
+    except ImportError:
+        CouldNotRetrieveTranscript = LookupError
+    try:
+        snippets = get_transcript_client().fetch(video_id, languages=CAPTION_LANGUAGES)
+    except CouldNotRetrieveTranscript:
+        return
+    for snippet in snippets:
+        text = snippet.text.replace('\n', ' ').strip()
+        if text:
+            yield text
+
+
+def iter_chunks(lines, chunk_tokens=TRANSCRIPT_CHUNK_TOKENS, max_tokens=TRANSCRIPT_MAX_TOKENS):
+    """Group caption lines into chunks of about `chunk_tokens`, stopping after `max_tokens`."""
+    chunk_chars = chunk_tokens * APPROX_CHARS_PER_TOKEN
+    budget = max_tokens * APPROX_CHARS_PER_TOKEN
+    parts, size = [], 0
+    for line in lines:
+        if budget <= 0:
+            break
+        line = line[:budget]
+        budget -= len(line)
+        parts.append(line)
+        size += len(line) + 1
+        if size >= chunk_chars:
+            yield ' '.join(parts)
+            parts, size = [], 0
+    if parts:
+        yield ' '.join(parts)
+
+# ---- SUMMARIZATION ----
+
+def load_transcript_prompts(path=TEMPLATES_PATH):
+    """Return the map and reduce prompts and their model settings from the template registry."""
+    with open(path, encoding='utf-8') as f:
+        config = yaml.safe_load(f)['transcript_prompts']
+    return {
+        'map': Template(config['map']),
+        'reduce': Template(config['reduce']),
+        'model': config.get('model', 'gpt-4o-mini'),
+        'temperature': config.get('temperature', 0.2),
+    }
+
+
+TRANSCRIPT_PROMPTS = load_transcript_prompts()
+
+
+def _complete(prompt, fresh=False):
+    return chat_completion(
+        get_openai_client(),
+        prompt,
+        model=TRANSCRIPT_PROMPTS['model'],
+        temperature=TRANSCRIPT_PROMPTS['temperature'],
+        fresh=fresh
+    )
+
+
+def summarize_chunk(title, chunk, part, fresh=False):
+    with stage_span('transcript_map'):
+        return _complete(TRANSCRIPT_PROMPTS['map'].substitute(title=title, chunk=chunk, part=part), fresh)
+
+
+def reduce_notes(title, notes, fresh=False):
+    with stage_span('transcript_reduce'):
+        return _complete(TRANSCRIPT_PROMPTS['reduce'].substitute(title=title, notes="\n\n".join(notes)), fresh)
+
+
+def _group_by_tokens(notes, max_tokens=REDUCE_INPUT_TOKENS):
+    max_chars = max_tokens * APPROX_CHARS_PER_TOKEN
+    group, size = [], 0
+    for note in notes:
+        if group and size + len(note) > max_chars:
+            yield group
+            group, size = [], 0
+        group.append(note)
+        size += len(note)
+    if group:
+        yield group
+
+
+def summarize_transcript(title, lines, fresh=False):
+    """Map-reduce caption lines into one brief; returns None when there is no text.
+
+    At most TRANSCRIPT_MAX_CONCURRENCY chunks are summarized at once and only
+    twice that many are held in memory.
+    """
+    notes = []
+    with ThreadPoolExecutor(max_workers=TRANSCRIPT_MAX_CONCURRENCY) as executor:
+        in_flight = deque()
+        for part, chunk in enumerate(iter_chunks(lines), start=1):
+            if len(in_flight) >= 2 * TRANSCRIPT_MAX_CONCURRENCY:
+                notes.append(in_flight.popleft().result())
+            in_flight.append(executor.submit(contextvars.copy_context().run, summarize_chunk, title, chunk, part, fresh))
+        notes.extend(future.result() for future in in_flight)
+
+        notes = [note for note in notes if note]
+        if not notes:
+            return None
+
+        # Merge notes in rounds until one reduce call can take them all
+        while sum(len(note) for note in notes) > REDUCE_INPUT_TOKENS * APPROX_CHARS_PER_TOKEN and len(notes) > 1:
+            futures = [
+                executor.submit(contextvars.copy_context().run, reduce_notes, title, group, fresh)
+                for group in _group_by_tokens(notes)
+            ]
+            notes = [future.result() for future in futures]
+    return reduce_notes(title, notes, fresh)
+
+# ---- BRIEF CACHE ----
+
+class BriefCache:
+    """SQLite store of transcript briefs, keyed by video ID and caption source."""
+
+    def __init__(self, path=TRANSCRIPT_CACHE_PATH):
+        self.path = path
+        self._initialized = False
+
+    def _connect(self):
+        """Open a connection; one per call keeps the cache safe across threads."""
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS briefs (
+                    video_id TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    brief TEXT NOT NULL,
+                    created_at REAL,
+                    PRIMARY KEY (video_id, source)
+                )
+            """)
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def get(self, video_id, source):
+        conn = self._connect()
+        try:
+            row = conn.execute(
+                "SELECT brief FROM briefs WHERE video_id = ? AND source = ?", (video_id, source)
+            ).fetchone()
+        finally:
+            conn.close()
+        return row[0] if row else None
+
+    def set(self, video_id, source, brief):
+        conn = self._connect()
+        try:
+            conn.execute(
+                "INSERT OR REPLACE INTO briefs (video_id, source, brief, created_at) VALUES (?, ?, ?, ?)",
+                (video_id, source, brief, time.time())
+            )
+            conn.commit()
+        finally:
+            conn.close()
+
+
+brief_cache = BriefCache()
+
+
+def file_source(caption_file):
+    """Cache source key for a caption file (path or binary file): a hash of its contents, read in blocks."""
+    digest = hashlib.sha256()
+    if isinstance(caption_file, (str, os.PathLike)):
+        with open(caption_file, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+    else:
+        caption_file.seek(0)
+        for block in iter(lambda: caption_file.read(1 << 20), b''):
+            digest.update(block)
+    return f"file:{digest.hexdigest()[:16]}"
+
+
+def get_transcript_brief(video_id, title, caption_file=None, fresh=False):
+    """Return the cached or newly built brief for a video, or None without captions.
+
+    Captions come from `caption_file` (a path or binary file) when given,
+    otherwise from the video's YouTube caption track.
+    """
+    source = file_source(caption_file) if caption_file is not None else 'youtube'
+    if not fresh:
+        cached = brief_cache.get(video_id, source)
+        if cached is not None:
+            return cached
+
+    if caption_file is not None:
+        lines = iter_caption_file(caption_file)
+    else:
+        lines = iter_youtube_captions(video_id)
+    brief = summarize_transcript(title, lines, fresh)
+    if brief:
+        brief_cache.set(video_id, source, brief)
+    return brief
+
+
+def with_transcript_brief(video_content, brief):
+    """Video content whose `full_text` (used by every template) ends with the transcript brief."""
+    if not brief:
+        return video_content
+    return dict(
+        video_content,
+        transcript_brief=brief,
+        full_text=f"{video_content['full_text']}\n\nTalk summary (from the transcript):\n{brief}"
+    )
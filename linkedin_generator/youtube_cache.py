@@ -0,0 +1,159 @@
+"""Persistent on-disk cache for YouTube video metadata, keyed by video ID."""
+import json
+import os
+import sqlite3
+import time
+
+# ---- CONFIGURATION ----
+
+YOUTUBE_CACHE_PATH = os.getenv("YOUTUBE_CACHE_PATH", os.path.join(".cache", "youtube.sqlite3"))
+
+# Title, description and channel rarely change; view counts do
+SNIPPET_TTL_SECONDS = int(os.getenv("YOUTUBE_SNIPPET_TTL_SECONDS", str(7 * 24 * 3600)))
+STATISTICS_TTL_SECONDS = int(os.getenv("YOUTUBE_STATISTICS_TTL_SECONDS", str(6 * 3600)))
+
+# ---- CACHE ----
+
+class YouTubeCache:
+    """SQLite-backed store for `videos().list` items.
+
+    The snippet and statistics parts are stored with their own timestamps so
+    that statistics can be refreshed on a shorter schedule than the snippet.
+    """
+
+    def __init__(self, path=YOUTUBE_CACHE_PATH, snippet_ttl=SNIPPET_TTL_SECONDS,
+                 statistics_ttl=STATISTICS_TTL_SECONDS):
+        self.path = path
+        self.snippet_ttl = snippet_ttl
+        self.statistics_ttl = statistics_ttl
+        self._initialized = False
+
+    def _connect(self):
+        """Open a connection; one per call keeps the cache safe across Streamlit threads."""
+        if not self._initialized:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=30)
+        if not self._initialized:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS videos (
+                    video_id TEXT PRIMARY KEY,
+                    snippet TEXT,
+                    snippet_fetched_at REAL,
+                    statistics TEXT,
+                    statistics_fetched_at REAL
+                )
+            """)
+            conn.commit()
+            self._initialized = True
+        return conn
+
+    def _load(self, video_id):
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT snippet, snippet_fetched_at, statistics, statistics_fetched_at "
+                "FROM videos WHERE video_id = ?",
+                (video_id,)
+            ).fetchone()
+        finally:
+            conn.close()
+
+    def _store(self, video_id, item, now):
+        conn = self._connect()
+        try:
+            if 'snippet' in item:
+                conn.execute(
+                    "INSERT INTO videos (video_id, snippet, snippet_fetched_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(video_id) DO UPDATE SET "
+                    "snippet = excluded.snippet, snippet_fetched_at = excluded.snippet_fetched_at",
+                    (video_id, json.dumps(item['snippet']), now)
+                )
+            if 'statistics' in item:
+                conn.execute(
+                    "INSERT INTO videos (video_id, statistics, statistics_fetched_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(video_id) DO UPDATE SET "
+                    "statistics = excluded.statistics, statistics_fetched_at = excluded.statistics_fetched_at",
+                    (video_id, json.dumps(item['statistics']), now)
+                )
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _lookup(self, video_id, now):
+        """Return (snippet, statistics, snippet_fresh, statistics_fresh) for a cached video."""
+        row = self._load(video_id)
+        snippet = statistics = None
+        snippet_fresh = statistics_fresh = False
+
+        if row:
+            snippet_json, snippet_at, statistics_json, statistics_at = row
+            if snippet_json is not None:
+                snippet = json.loads(snippet_json)
+                snippet_fresh = now - snippet_at < self.snippet_ttl
+            if statistics_json is not None:
+                statistics = json.loads(statistics_json)
+                statistics_fresh = now - statistics_at < self.statistics_ttl
+
+        return snippet, statistics, snippet_fresh, statistics_fresh
+
+    def get_video(self, video_id, fetch):
+        """Return a `videos().list` item, calling `fetch(part)` only for stale parts.
+
+        `fetch` receives the comma-separated part string to request and returns
+        the API item (or None when the video does not exist).
+        """
+        now = time.time()
+        snippet, statistics, snippet_fresh, statistics_fresh = self._lookup(video_id, now)
+
+        if snippet_fresh and statistics_fresh:
+            return {'snippet': snippet, 'statistics': statistics}
+
+        # A videos().list call costs the same quota whatever the parts, so refresh
+        # both when the snippet is stale and only statistics otherwise
+        part = 'statistics' if snippet_fresh else 'snippet,statistics'
+        try:
+            item = fetch(part)
+        except Exception:
+            # Serve stale data rather than failing when the API is unavailable
+            if snippet is not None:
+                return {'snippet': snippet, 'statistics': statistics or {}}
+            raise
+
+        if item is None:
+            return None
+
+        item.setdefault('statistics', {})
+        self._store(video_id, item, now)
+        return {
+            'snippet': item.get('snippet', snippet),
+            'statistics': item['statistics'],
+        }
+
+    def get_videos(self, video_ids, fetch_batch, batch_size=50):
+        """Return `{video_id: item}` for many videos, fetching stale ones in batches.
+
+        `fetch_batch(part, ids)` requests up to `batch_size` IDs in a single
+        `videos().list` call and returns the items it found. Videos that do not
+        exist are left out of the result.
+        """
+        now = time.time()
+        items = {}
+        stale_ids = []
+
+        for video_id in dict.fromkeys(video_ids):
+            snippet, statistics, snippet_fresh, statistics_fresh = self._lookup(video_id, now)
+            if snippet_fresh and statistics_fresh:
+                items[video_id] = {'snippet': snippet, 'statistics': statistics}
+            else:
+                stale_ids.append(video_id)
+
+        for start in range(0, len(stale_ids), batch_size):
+            for item in fetch_batch('snippet,statistics', stale_ids[start:start + batch_size]):
+                item.setdefault('statistics', {})
+                self._store(item['id'], item, now)
+                items[item['id']] = {'snippet': item['snippet'], 'statistics': item['statistics']}
+
+        return items
@@ -0,0 +1,323 @@
+"""Headless HTTP service exposing the generation pipeline.
+
+Jobs are accepted into a bounded queue and processed by a fixed number of
+async workers; the blocking pipeline calls run on a thread pool so the event
+loop stays free to answer polls and stream progress.
+
+Usage:
+    uvicorn service:app --host 0.0.0.0 --port 8000
+
+    curl -X POST localhost:8000/jobs -H 'Content-Type: application/json' \\
+         -d '{"url": "https://www.youtube.com/watch?v=...", "kind": "posts"}'
+    curl localhost:8000/jobs/<job_id>
+    curl -N localhost:8000/jobs/<job_id>/events
+"""
+import asyncio
+import json
+import os
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel
+
+from linkedin_generator.exports import mime_type
+from linkedin_generator.metrics import render_prometheus
+from linkedin_generator.pipeline import (
+    WORKFLOW_MODE,
+    WORKFLOW_MODES,
+    VideoNotFoundError,
+    add_transcript_brief,
+    export_infographic,
+    find_reusable_posts,
+    generate_all_template_posts,
+    generate_all_template_posts_combined,
+    generate_workflow_html,
+    get_video_content,
+    html_to_image_simple,
+    remember_posts,
+)
+from linkedin_generator.renderer import RENDER_BACKENDS
+
+# ---- CONFIGURATION ----
+
+# Jobs processed at once; each posts job fans out to MAX_CONCURRENT_LLM_CALLS requests
+SERVICE_WORKERS = int(os.getenv("SERVICE_WORKERS", "4"))
+
+# Jobs waiting beyond this are rejected with 429 instead of queueing without bound
+SERVICE_MAX_QUEUED_JOBS = int(os.getenv("SERVICE_MAX_QUEUED_JOBS", "32"))
+
+# Finished jobs (and their images) are kept in memory this long
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+
+RETRY_AFTER_SECONDS = 30
+
+JOB_KINDS = ('posts', 'workflow', 'infographic')
+
+# ---- JOBS ----
+
+class JobRequest(BaseModel):
+    url: str
+    kind: str = 'posts'
+    fresh: bool = False
+    combined: bool = False
+    transcript: bool = False
+    reuse: bool = True
+    workflow_mode: str = WORKFLOW_MODE
+    render_backend: Optional[str] = None
+    exports: bool = False
+
+
+class Job:
+    """One submitted request, its result, and the listeners following its events."""
+
+    def __init__(self, request):
+        self.id = uuid.uuid4().hex
+        self.request = request
+        self.status = 'queued'
+        self.result = None
+        self.error = None
+        self.image = None
+        self.exports = {}
+        self.created_at = time.time()
+        self.finished_at = None
+        self.events = []
+        self.listeners = set()
+
+    def publish(self, event, data):
+        """Record an event and hand it to every open event stream (event loop thread only)."""
+        message = (event, data)
+        if event != 'delta':
+            # Deltas are only streamed live; late listeners get the final result instead
+            self.events.append(message)
+        for listener in self.listeners:
+            listener.put_nowait(message)
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'kind': self.request.kind,
+            'url': self.request.url,
+            'status': self.status,
+            'result': self.result,
+            'error': self.error,
+            'has_image': self.image is not None,
+            'exports': list(self.exports),
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+        }
+
+
+jobs = {}
+
+
+def expire_jobs(now=None):
+    """Drop finished jobs older than JOB_RESULT_TTL_SECONDS."""
+    now = now or time.time()
+    for job_id in [job_id for job_id, job in jobs.items()
+                   if job.finished_at and now - job.finished_at > JOB_RESULT_TTL_SECONDS]:
+        del jobs[job_id]
+
+# ---- WORKERS ----
+
+def run_job(job, on_delta):
+    """Run one job's pipeline stages synchronously on a worker thread."""
+    request = job.request
+    video_id, video_content = get_video_content(request.url)
+    warnings = []
+    if request.transcript:
+        # Like the apps, fall back to the description rather than failing the job
+        try:
+            video_content = add_transcript_brief(video_id, video_content)
+        except Exception as e:
+            warnings.append(f"Could not summarize the transcript, using the description only: {str(e)}")
+        else:
+            if 'transcript_brief' not in video_content:
+                warnings.append("No captions found for this video, using the description only")
+    result = {'video_id': video_id, 'title': video_content['title'], 'channel': video_content['channel']}
+    if warnings:
+        result['warnings'] = warnings
+
+    if request.kind == 'posts':
+        reused = find_reusable_posts(video_id, video_content, request.url) if request.reuse and not request.fresh else None
+        if reused:
+            # A re-upload of a talk that already has posts; no LLM calls needed
+            all_posts, pinned_comment, hashtags, match = reused
+            result.update(posts=all_posts, pinned_comment=pinned_comment, hashtags=hashtags,
+                          duplicate_of={'video_id': match['video_id'], 'similarity': round(match['similarity'], 3)})
+            return result, None
+        if request.combined:
+            all_posts, pinned_comment, hashtags = generate_all_template_posts_combined(
+                video_content, request.url, request.fresh
+            )
+        else:
+            all_posts, pinned_comment, hashtags = generate_all_template_posts(
+                video_content, request.url, request.fresh, on_delta=on_delta
+            )
+        remember_posts(video_id, video_content, request.url, all_posts, pinned_comment, hashtags)
+        result.update(posts=all_posts, pinned_comment=pinned_comment, hashtags=hashtags)
+        return result, None
+
+    workflow_html = generate_workflow_html(video_content, mode=request.workflow_mode)
+    if workflow_html.startswith("Error"):
+        raise RuntimeError(workflow_html)
+    result['workflow_html'] = workflow_html
+    if request.kind == 'workflow':
+        return result, None
+
+    image_data = html_to_image_simple(workflow_html, request.render_backend)
+    if image_data is None:
+        raise RuntimeError("Could not render the infographic")
+    if request.exports:
+        # Portrait, link-card and carousel exports come from the same render; the
+        # infographic itself is still returned when they cannot be encoded
+        try:
+            job.exports = export_infographic(image_data)
+        except Exception as e:
+            result.setdefault('warnings', []).append(f"Could not encode the exports: {e}")
+    return result, image_data
+
+
+async def worker(queue, executor):
+    """Take jobs off the queue forever, running the blocking work on the executor."""
+    loop = asyncio.get_running_loop()
+    while True:
+        job = await queue.get()
+        try:
+            job.status = 'running'
+            job.publish('status', {'status': job.status})
+
+            def on_delta(template_name, text, job=job):
+                loop.call_soon_threadsafe(job.publish, 'delta', {'template': template_name, 'text': text})
+
+            try:
+                job.result, job.image = await loop.run_in_executor(executor, run_job, job, on_delta)
+                job.status = 'done'
+            except (ValueError, VideoNotFoundError) as e:
+                job.status, job.error = 'failed', str(e)
+            except Exception as e:
+                job.status, job.error = 'failed', f"Error generating content: {str(e)}"
+            job.finished_at = time.time()
+            job.publish('status', {'status': job.status, 'error': job.error})
+            job.publish('result', job.to_dict())
+        finally:
+            queue.task_done()
+
+
+async def cleanup(interval):
+    """Expire old jobs periodically."""
+    while True:
+        await asyncio.sleep(interval)
+        expire_jobs()
+
+# ---- APP ----
+
+@asynccontextmanager
+async def lifespan(app):
+    app.state.queue = asyncio.Queue(maxsize=SERVICE_MAX_QUEUED_JOBS)
+    executor = ThreadPoolExecutor(max_workers=SERVICE_WORKERS, thread_name_prefix="pipeline")
+    tasks = [asyncio.create_task(worker(app.state.queue, executor)) for _ in range(SERVICE_WORKERS)]
+    tasks.append(asyncio.create_task(cleanup(min(JOB_RESULT_TTL_SECONDS, 60))))
+    try:
+        yield
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+app = FastAPI(title="LinkedIn Content Generator", lifespan=lifespan)
+
+
+def get_job(job_id):
+    job = jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found or expired")
+    return job
+
+
+@app.get("/healthz")
+async def healthz():
+    queue = app.state.queue
+    return {'status': 'ok', 'queued': queue.qsize(), 'max_queued': queue.maxsize, 'workers': SERVICE_WORKERS}
+
+
+@app.get("/metrics")
+async def metrics():
+    """Per-stage latency histograms and LLM token counters in Prometheus text format."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/jobs", status_code=202)
+async def create_job(request: JobRequest):
+    if request.kind not in JOB_KINDS:
+        raise HTTPException(status_code=422, detail=f"kind must be one of {', '.join(JOB_KINDS)}")
+    if request.workflow_mode not in WORKFLOW_MODES:
+        raise HTTPException(status_code=422, detail=f"workflow_mode must be one of {', '.join(WORKFLOW_MODES)}")
+    if request.render_backend is not None and request.render_backend not in RENDER_BACKENDS:
+        raise HTTPException(status_code=422, detail=f"render_backend must be one of {', '.join(RENDER_BACKENDS)}")
+
+    job = Job(request)
+    try:
+        app.state.queue.put_nowait(job)
+    except asyncio.QueueFull:
+        return JSONResponse(
+            status_code=429,
+            content={'detail': "Too many queued jobs, try again later"},
+            headers={'Retry-After': str(RETRY_AFTER_SECONDS)}
+        )
+    jobs[job.id] = job
+    return {'job_id': job.id, 'status': job.status}
+
+
+@app.get("/jobs/{job_id}")
+async def read_job(job_id: str):
+    return get_job(job_id).to_dict()
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """Server-sent events: status changes, post token deltas, then the final result."""
+    job = get_job(job_id)
+    listener = asyncio.Queue()
+    # Taken together: a job finishing before stream() starts leaves its result in the listener
+    history, finished = list(job.events), job.finished_at is not None
+    job.listeners.add(listener)
+
+    async def stream():
+        try:
+            for event, data in history:
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+            if finished:
+                return
+            while True:
+                event, data = await listener.get()
+                yield f"event: {event}\ndata: {json.dumps(data)}\n\n"
+                if event == 'result':
+                    return
+        finally:
+            job.listeners.discard(listener)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={'Cache-Control': 'no-cache'})
+
+
+@app.get("/jobs/{job_id}/image")
+async def job_image(job_id: str):
+    job = get_job(job_id)
+    if job.image is None:
+        raise HTTPException(status_code=404, detail="No image for this job")
+    return Response(content=job.image, media_type="image/png")
+
+
+@app.get("/jobs/{job_id}/exports/{name}")
+async def job_export(job_id: str, name: str):
+    job = get_job(job_id)
+    if name not in job.exports:
+        raise HTTPException(status_code=404, detail="No such export for this job")
+    return Response(content=job.exports[name], media_type=mime_type(name))